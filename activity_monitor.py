@@ -2,19 +2,47 @@ import threading
 import time
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 import os
 import re
+import sys
 import json
-import asyncio
-import websockets
-from urllib.parse import urlparse
+import functools
+import websocket
 from dotenv import load_dotenv
 import paho.mqtt.client as mqtt
 
+# Use orjson for decoding status payloads when it's available
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Load environment variables once at import rather than per instance
+load_dotenv()
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
 class ActivityMonitor:
+    # Fixed attribute layout: slot access avoids per-instance __dict__ lookups on the status path
+    __slots__ = (
+        'webcam_controller', 'poll_interval', 'max_poll_interval', 'poll_timeout',
+        'mqtt_broker', 'mqtt_port', 'mqtt_topic_prefix', 'mqtt_username', 'mqtt_password',
+        'mqtt_client', 'use_mqtt', 'mqtt_running_state', 'mqtt_pattern_state',
+        '_running_topic', '_pattern_topic',
+        'target_url', 'ws_url', 'ws_status_endpoint', 'ws_data_path', 'status_endpoint',
+        'status_property', 'current_file_property', 'use_websocket', 'ws',
+        'ws_reconnect_delay', 'ws_reconnect_max_delay',
+        'file_change_debounce', '_pending_file', '_pending_timer', '_status_lock',
+        'monitor_thread', 'stop_event', 'is_machine_running', 'last_activity_running',
+        'last_current_file', 'ignored_patterns',
+        '_extract_status', '_fused_pattern', '_regex_patterns', '_literal_patterns', '_exact_patterns', '_is_ignored_cached',
+        '_last_ignored', '_last_payload_key', '_session', '_last_etag', '_poll_headers',
+        '_poll_log_target',
+    )
+    
     def __init__(self, webcam_controller, poll_interval=5):
         """
         Initialize the activity monitor
@@ -23,16 +51,17 @@ class ActivityMonitor:
             webcam_controller: WebcamController instance to control timelapse
             poll_interval: How often to poll the status endpoint (in seconds)
         """
-        # Load environment variables
-        load_dotenv()
-        
         self.webcam_controller = webcam_controller
         self.poll_interval = poll_interval
+        # Cap for the idle poll backoff; kept close to poll_interval so a new activity is noticed promptly
+        self.max_poll_interval = max(poll_interval, float(os.getenv('MAX_POLL_INTERVAL', poll_interval * 2)))
         
         # MQTT configuration
         self.mqtt_broker = os.getenv('MQTT_BROKER', 'localhost')
         self.mqtt_port = int(os.getenv('MQTT_PORT', '1883'))
         self.mqtt_topic_prefix = os.getenv('MQTT_TOPIC_PREFIX', 'dune_weaver_black')
+        self._running_topic = f"{self.mqtt_topic_prefix}/state/running"
+        self._pattern_topic = f"{self.mqtt_topic_prefix}/pattern/set/state"
         self.mqtt_username = os.getenv('MQTT_USERNAME')
         self.mqtt_password = os.getenv('MQTT_PASSWORD')
         self.mqtt_client = None
@@ -41,18 +70,46 @@ class ActivityMonitor:
         self.target_url = os.getenv('TARGET_API_URL', 'http://localhost:8080')
         self.ws_url = os.getenv('WS_STATUS_URL', '')  # WebSocket URL if using WS
         self.ws_status_endpoint = os.getenv('WS_STATUS_ENDPOINT', '/ws/status')
-        self.ws_data_path = os.getenv('WS_DATA_PATH', 'data')  # Path to data in WS messages
+        self.ws_data_path = sys.intern(os.getenv('WS_DATA_PATH', 'data'))  # Path to data in WS messages
         self.status_endpoint = f"{self.target_url}{os.getenv('STATUS_ENDPOINT', '/status')}"
-        self.status_property = os.getenv('STATUS_PROPERTY', 'is_running')
-        self.current_file_property = os.getenv('CURRENT_ACTIVITY_PROPERTY', 'current_file')
+        # Interned so status dict lookups can match on identity with decoded keys
+        self.status_property = sys.intern(os.getenv('STATUS_PROPERTY', 'is_running'))
+        self.current_file_property = sys.intern(os.getenv('CURRENT_ACTIVITY_PROPERTY', 'current_file'))
+        
+        # Bind the property names once so status handling does a single call per update
+        status_property = self.status_property
+        current_file_property = self.current_file_property
+        self._extract_status = lambda status: (status.get(status_property, False), status.get(current_file_property))
+        
         self.monitor_thread = None
         self.stop_event = threading.Event()
         self.is_machine_running = False  # Track actual machine running state
         self.last_activity_running = False  # Track if we're capturing
         self.last_current_file = None  # Track the last current_file value
         self.ignored_patterns = []  # List of patterns to ignore
+        self._fused_pattern = None  # Single compiled alternation of the valid ignored patterns that can be fused
+        self._regex_patterns = ()  # Compiled ignored patterns that must run on their own (groups, global flags)
+        self._literal_patterns = ()  # Ignored patterns that failed to compile, matched as substrings
+        self._exact_patterns = frozenset()  # All ignored patterns, for an O(1) exact-name check
+        self._is_ignored_cached = functools.lru_cache(maxsize=128)(self._match_ignored_patterns)  # Rebuilt when patterns change
+        self._last_ignored = False  # Whether the last running activity was ignored
+        self._last_payload_key = None  # (is_running, current_file) of the last handled update
         self.ws = None  # WebSocket connection
         self.ws_reconnect_delay = 5  # Seconds to wait before reconnecting WS
+        self.ws_reconnect_max_delay = 60  # Upper bound for the exponential reconnect backoff
+        self.file_change_debounce = 0.5  # Seconds a file change must settle before capture restarts
+        self._pending_file = None  # File waiting on the debounce timer
+        self._pending_timer = None
+        self._status_lock = threading.Lock()  # Serializes status handling with the debounced file change
+        
+        # Persistent HTTP session so polls reuse one keep-alive connection
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._last_etag = None  # ETag of the last status response, for conditional polls
+        self._poll_headers = {'Connection': 'keep-alive', 'Accept': 'application/json'}
+        self.poll_timeout = (1.0, 4.0)  # (connect, read) timeouts so a dead server is noticed quickly
         
         # Add MQTT state tracking
         self.mqtt_running_state = None
@@ -60,8 +117,9 @@ class ActivityMonitor:
         
         # Determine if we're using WebSocket based on URL
         self.use_websocket = bool(self.ws_url and (self.ws_url.startswith('ws://') or self.ws_url.startswith('wss://')))
+        self._poll_log_target = f"{self.ws_url}{self.ws_status_endpoint}" if self.use_websocket else self.status_endpoint
         logger.info(f"Using WebSocket endpoint: {self.ws_url}{self.ws_status_endpoint}")
-        logger.info(f"Activity monitor initialized with {'WebSocket' if self.use_websocket else 'HTTP'} connection to {self.ws_url}{self.ws_status_endpoint if self.use_websocket else self.status_endpoint}")
+        logger.info(f"Activity monitor initialized with {'WebSocket' if self.use_websocket else 'HTTP'} connection to {self._poll_log_target}")
         if self.use_websocket:
             logger.info(f"WebSocket URL: {self.ws_url}")
         else:
@@ -79,30 +137,71 @@ class ActivityMonitor:
     def set_ignored_patterns(self, patterns):
         """Set the list of patterns to ignore"""
         self.ignored_patterns = patterns
+        
+        # Fuse valid regexes into one alternation so a status update is a single scan
+        default_flags = re.compile('').flags
+        fusable_patterns = []
+        regex_patterns = []
+        literal_patterns = []
+        for pattern in patterns or []:
+            try:
+                compiled = re.compile(pattern)
+            except re.error:
+                # If the pattern is invalid, treat it as a simple string match
+                literal_patterns.append(pattern)
+                continue
+            # Group numbers shift and global flags like (?i) must lead the expression once fused,
+            # so those patterns keep their own compiled regex
+            if compiled.groups or compiled.flags != default_flags:
+                regex_patterns.append(compiled)
+            else:
+                fusable_patterns.append(pattern)
+        
+        fused_pattern = None
+        if fusable_patterns:
+            try:
+                fused_pattern = re.compile("|".join(f"(?:{p})" for p in fusable_patterns))
+            except re.error:
+                regex_patterns.extend(re.compile(p) for p in fusable_patterns)
+        self._fused_pattern = fused_pattern
+        self._regex_patterns = tuple(regex_patterns)
+        self._literal_patterns = tuple(literal_patterns)
+        self._exact_patterns = frozenset(patterns or ())
+        # Drop cached results and re-evaluate the next status update against the new patterns
+        self._is_ignored_cached = functools.lru_cache(maxsize=128)(self._match_ignored_patterns)
+        self._last_payload_key = None
+        self._last_etag = None  # A 304 would skip the handler, so fetch the full status again
         logger.info(f"Updated ignored patterns: {patterns}")
     
     def is_ignored_activity(self, current_file):
         """Check if the current file matches any of the ignored patterns"""
-        if not current_file or not self.ignored_patterns:
+        if not current_file:
             return False
-            
-        for pattern in self.ignored_patterns:
-            try:
-                if re.search(pattern, current_file) or current_file == None or current_file == "" or current_file == "None":
-                    #logger.info(f"Ignoring activity matching pattern '{pattern}': {current_file}")
-                    return True
-            except re.error:
-                # If the pattern is invalid, treat it as a simple string match
-                if pattern in current_file:
-                    #logger.info(f"Ignoring activity containing '{pattern}': {current_file}")
-                    return True
+        
+        return self._is_ignored_cached(current_file)
+    
+    def _match_ignored_patterns(self, current_file):
+        """Run the ignored patterns against current_file (uncached)"""
+        # Patterns are usually exact file names, which a set lookup settles without a regex scan
+        if current_file in self._exact_patterns:
+            return True
+        
+        # Some printers report an idle job as the string "None"; ignore it whenever regex patterns are set
+        if current_file == "None" and (self._fused_pattern is not None or self._regex_patterns):
+            return True
+        
+        if self._fused_pattern is not None and self._fused_pattern.search(current_file):
+            return True
+        
+        if any(regex.search(current_file) for regex in self._regex_patterns):
+            return True
                     
-        return False
+        return any(literal in current_file for literal in self._literal_patterns)
     
     def _setup_mqtt(self):
         """Setup MQTT client and connections"""
         try:
-            self.mqtt_client = mqtt.Client()
+            self.mqtt_client = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION2)
             
             # Configure authentication if credentials are provided
             if self.mqtt_username and self.mqtt_password:
@@ -115,46 +214,45 @@ class ActivityMonitor:
             self.mqtt_client.on_message = self._on_mqtt_message
             self.mqtt_client.on_disconnect = self._on_mqtt_disconnect
             
+            # paho's network thread (loop_start) handles reconnects with this backoff
+            self.mqtt_client.reconnect_delay_set(min_delay=1, max_delay=60)
+            
             logger.info(f"Connecting to MQTT broker at {self.mqtt_broker}:{self.mqtt_port}")
-            self.mqtt_client.connect(self.mqtt_broker, self.mqtt_port)
+            self.mqtt_client.connect_async(self.mqtt_broker, self.mqtt_port)
             self.mqtt_client.loop_start()
         except Exception as e:
             logger.error(f"Failed to setup MQTT: {str(e)}")
+            self.mqtt_client = None
             self.use_mqtt = False
             
-    def _on_mqtt_connect(self, client, userdata, flags, rc):
+    def _on_mqtt_connect(self, client, userdata, flags, reason_code, properties):
         """Callback for when MQTT client connects"""
+        if reason_code.is_failure:
+            logger.error(f"Failed to connect to MQTT broker: {reason_code}")
+            return
         logger.info("Connected to MQTT broker")
-        # Subscribe to relevant topics
-        topics = [
-            f"{self.mqtt_topic_prefix}/state/running",
-            f"{self.mqtt_topic_prefix}/pattern/set/state"
-        ]
-        for topic in topics:
-            client.subscribe(topic)
-            logger.info(f"Subscribed to {topic}")
+        # Subscribe to relevant topics in a single SUBSCRIBE packet
+        topics = [self._running_topic, self._pattern_topic]
+        client.subscribe([(topic, 0) for topic in topics])
+        logger.info(f"Subscribed to {topics}")
 
-    def _on_mqtt_disconnect(self, client, userdata, rc):
+    def _on_mqtt_disconnect(self, client, userdata, disconnect_flags, reason_code, properties):
         """Callback for when MQTT client disconnects"""
-        logger.warning("Disconnected from MQTT broker")
         if not self.stop_event.is_set():
-            logger.info("Attempting to reconnect...")
-            try:
-                client.reconnect()
-            except Exception as e:
-                logger.error(f"Failed to reconnect to MQTT: {str(e)}")
+            # paho's network thread reconnects on its own
+            logger.warning(f"Disconnected from MQTT broker ({reason_code}), reconnecting...")
 
     def _on_mqtt_message(self, client, userdata, msg):
         """Handle incoming MQTT messages"""
         try:
             topic = msg.topic
             payload = msg.payload.decode()
-            logger.debug(f"MQTT message received - Topic: {topic}, Payload: {payload}")
+            logger.debug("MQTT message received - Topic: %s, Payload: %s", topic, payload)
             
             # Update the appropriate state based on topic
-            if topic.endswith('/state/running'):
+            if topic == self._running_topic:
                 is_running = payload.lower() == 'running'
-                logger.debug(f"Running state update: {is_running}")
+                logger.debug("Running state update: %s", is_running)
                 self.mqtt_running_state = is_running
                 
                 # If not running, we can process immediately to stop capture
@@ -166,9 +264,9 @@ class ActivityMonitor:
                     self._process_mqtt_status(status)
                     return
                 
-            elif topic.endswith('/pattern/set/state'):
+            elif topic == self._pattern_topic:
                 current_file = payload
-                logger.debug(f"Pattern update: {current_file}")
+                logger.debug("Pattern update: %s", current_file)
                 self.mqtt_pattern_state = current_file
                 
             else:
@@ -189,27 +287,32 @@ class ActivityMonitor:
     def _process_mqtt_status(self, status):
         """Process a complete MQTT status update"""
         try:
-            # Use asyncio to handle the status update
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self._handle_status_update(status))
-            loop.close()
+            # Status handling has no awaits, so run it on paho's network thread directly
+            self._handle_status_update(status)
         except Exception as e:
             logger.error(f"Error processing MQTT status: {str(e)}")
 
+    def is_running(self):
+        """Whether the MQTT client or a monitor thread is currently active"""
+        return self.mqtt_client is not None or bool(self.monitor_thread and self.monitor_thread.is_alive())
+
     def start(self):
         """Start the activity monitor thread"""
-        if self.monitor_thread and self.monitor_thread.is_alive():
+        if self.is_running():
             logger.warning("Activity monitor already running")
             return
         
         logger.info("Starting activity monitor")
         self.stop_event.clear()
+        self._last_etag = None
+        self._last_payload_key = None
         
         if self.use_mqtt:
+            # No monitor thread needed, paho's loop_start() thread does the work
             self._setup_mqtt()
-            self.monitor_thread = threading.Thread(target=self._mqtt_monitor_loop, daemon=True)
-        elif self.use_websocket:
+            return
+        
+        if self.use_websocket:
             self.monitor_thread = threading.Thread(target=self._run_websocket_loop, daemon=True)
         else:
             self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
@@ -218,69 +321,97 @@ class ActivityMonitor:
     
     def stop(self):
         """Stop the activity monitor thread"""
-        if not self.monitor_thread or not self.monitor_thread.is_alive():
+        if not self.is_running():
             logger.warning("Activity monitor not running")
             return
         
         logger.info("Stopping activity monitor")
         self.stop_event.set()
+        self._cancel_pending_file_change()
+        
+        # Wake a WebSocket reader blocked in recv()
+        ws = self.ws
+        if ws is not None:
+            ws.abort()
         
         if self.mqtt_client:
-            self.mqtt_client.loop_stop()
             self.mqtt_client.disconnect()
-            
-        self.monitor_thread.join(timeout=10)
-        if self.monitor_thread.is_alive():
-            logger.warning("Activity monitor thread did not stop cleanly")
+            self.mqtt_client.loop_stop()
+            self.mqtt_client = None
+        
+        if self.monitor_thread and self.monitor_thread.is_alive():
+            self.monitor_thread.join(timeout=5)
+            if self.monitor_thread.is_alive():
+                logger.warning("Activity monitor thread did not stop cleanly")
+        
+        # Release pooled HTTP connections
+        self._session.close()
     
     def _run_websocket_loop(self):
-        """Run the asyncio event loop for WebSocket connection"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        """Keep the WebSocket connected, backing off exponentially between failed attempts"""
+        delay = self.ws_reconnect_delay
         while not self.stop_event.is_set():
             try:
-                loop.run_until_complete(self._websocket_monitor())
+                self._websocket_monitor()
+                delay = self.ws_reconnect_delay
             except Exception as e:
+                if self.stop_event.is_set():
+                    break
                 logger.error(f"WebSocket loop error: {str(e)}")
-                if not self.stop_event.is_set():
-                    logger.info(f"Reconnecting in {self.ws_reconnect_delay} seconds...")
-                    time.sleep(self.ws_reconnect_delay)
-        loop.close()
+                logger.info(f"Reconnecting in {delay} seconds...")
+                if self.stop_event.wait(delay):
+                    break
+                delay = min(delay * 2, self.ws_reconnect_max_delay)
 
-    async def _websocket_monitor(self):
+    def _websocket_monitor(self):
         """Monitor status via WebSocket connection"""
         logger.info(f"Connecting to WebSocket at {self.ws_url}{self.ws_status_endpoint}")
+        ws = websocket.create_connection(self.ws_url + self.ws_status_endpoint)
+        self.ws = ws
         try:
-            async with websockets.connect(self.ws_url + self.ws_status_endpoint) as websocket:
-                logger.info("WebSocket connected successfully")
-                self.ws = websocket
-                
-                while not self.stop_event.is_set():
-                    try:
-                        message = await websocket.recv()
-                        status = json.loads(message)
-                        await self._handle_status_update(status)
-                    except websockets.ConnectionClosed:
+            logger.info("WebSocket connected successfully")
+            
+            while not self.stop_event.is_set():
+                try:
+                    # Blocks until a frame arrives; stop() aborts the socket to wake it
+                    message = ws.recv()
+                    if not message:
+                        continue
+                    status = _json_loads(message)
+                    self._handle_status_update(status)
+                except websocket.WebSocketConnectionClosedException:
+                    if not self.stop_event.is_set():
                         logger.warning("WebSocket connection closed")
-                        break
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse WebSocket message: {str(e)}")
-                    except Exception as e:
-                        logger.error(f"Error processing WebSocket message: {str(e)}")
+                    break
+                except json.JSONDecodeError as e:
+                    logger.error(f"Failed to parse WebSocket message: {str(e)}")
         
         finally:
             self.ws = None
+            ws.close()
 
-    async def _handle_status_update(self, status):
+    def _handle_status_update(self, status):
         """Handle a status update from either WebSocket or HTTP polling"""
+        with self._status_lock:
+            self._apply_status_update(status)
+    
+    def _apply_status_update(self, status):
+        """Update activity state from a status update; caller holds _status_lock"""
         try:
             # If using WebSocket, get the data from the nested structure
-            if self.use_websocket and self.ws_data_path in status:
-                status = status[self.ws_data_path]
+            if self.use_websocket:
+                ws_data_path = self.ws_data_path
+                if ws_data_path in status:
+                    status = status[ws_data_path]
 
-            logger.debug(f"Status update: {status}")
-            is_running = status.get(self.status_property, False)
-            current_file = status.get(self.current_file_property)
+            logger.debug("Status update: %s", status)
+            is_running, current_file = self._extract_status(status)
+            
+            # Nothing to do if the relevant part of the status hasn't changed
+            payload_key = (is_running, current_file)
+            if payload_key == self._last_payload_key:
+                return
+            self._last_payload_key = payload_key
             
             # Update machine state
             self.is_machine_running = is_running
@@ -292,15 +423,27 @@ class ActivityMonitor:
                     self.webcam_controller.activity_stopped()
                 self.last_activity_running = False
                 self.last_current_file = None
+                self._last_ignored = False
                 return
             
             # At this point, we know is_running is True
-            # Store current file before checking if ignored
+            # Check if this activity should be ignored first; the patterns may have changed mid-activity
+            is_ignored = bool(current_file) and self.is_ignored_activity(current_file)
+            
+            # Still capturing the same, non-ignored file, none of the transition logic below applies
+            if self.last_activity_running and current_file == self.last_current_file and not is_ignored:
+                return
+            
+            # Store current file, keeping the previous one for change detection
+            previous_file = self.last_current_file
             self.last_current_file = current_file
             
-            # Check if this activity should be ignored
-            if current_file and self.is_ignored_activity(current_file):
-                logger.debug(f"Ignoring activity: {current_file}")
+            # Log only when the ignored state changes
+            if is_ignored and not self._last_ignored:
+                logger.info(f"Ignoring activity: {current_file}")
+            self._last_ignored = is_ignored
+            
+            if is_ignored:
                 # If we were capturing a non-ignored activity, stop it
                 if self.last_activity_running:
                     logger.info("Stopping capture for ignored activity")
@@ -314,39 +457,80 @@ class ActivityMonitor:
                 logger.info("Activity started or transitioned from ignored, notifying webcam controller")
                 self.webcam_controller.activity_started(activity_file=current_file)
                 self.last_activity_running = True
-            elif current_file != self.last_current_file:
-                # File changed while running - restart capture
-                logger.info(f"Current file changed from {self.last_current_file} to {current_file}, notifying about new activity")
-                self.webcam_controller.activity_stopped()
-                self.webcam_controller.activity_started(activity_file=current_file)
+            elif current_file != previous_file:
+                # File changed while running - restart capture once the change settles
+                logger.info(f"Current file changed from {previous_file} to {current_file}, notifying about new activity")
+                self._schedule_file_change(current_file)
         
         except Exception as e:
             logger.error(f"Error handling status update: {str(e)}")
 
+    def _schedule_file_change(self, current_file):
+        """Debounce a file change so a burst of changes restarts capture only once"""
+        self._cancel_pending_file_change()
+        self._pending_file = current_file
+        self._pending_timer = threading.Timer(self.file_change_debounce, self._commit_file_change)
+        self._pending_timer.daemon = True
+        self._pending_timer.start()
+
+    def _cancel_pending_file_change(self):
+        """Cancel a debounced file change that hasn't fired yet"""
+        if self._pending_timer is not None:
+            self._pending_timer.cancel()
+            self._pending_timer = None
+
+    def _commit_file_change(self):
+        """Restart capture for the settled file, if it's still the one running"""
+        # Runs on the timer thread, so check and restart under the same lock status updates take;
+        # otherwise a stop handled in between would be undone by the restart
+        with self._status_lock:
+            current_file = self._pending_file
+            self._pending_timer = None
+            if self.stop_event.is_set():
+                return
+            # Skip if the activity stopped, became ignored or changed again in the meantime
+            if not self.last_activity_running or self.last_current_file != current_file:
+                return
+            try:
+                self.webcam_controller.activity_stopped()
+                self.webcam_controller.activity_started(activity_file=current_file)
+            except Exception as e:
+                logger.error(f"Error restarting capture for {current_file}: {str(e)}")
+
     def _monitor_loop(self):
         """Background thread for monitoring activity status via HTTP polling"""
         last_poll_time = time.time()
+        idle_streak = 0  # Consecutive polls that didn't change the handled status
         
         while not self.stop_event.is_set():
+            previous_payload_key = self._last_payload_key
             try:
                 current_time = time.time()
                 elapsed = current_time - last_poll_time
-                logger.debug(f"Time since last poll: {elapsed:.2f} seconds")
+                logger.debug("Time since last poll: %.2f seconds", elapsed)
                 last_poll_time = current_time
                 
-                logger.info(f"Polling status from {self.target_url}{self.status_endpoint if not self.use_websocket else self.ws_status_endpoint}")
+                logger.debug("Polling status from %s", self._poll_log_target)
                 # Get activity status from target API
-                response = requests.get(self.target_url + self.status_endpoint, timeout=5)
+                if self._last_etag:
+                    self._poll_headers['If-None-Match'] = self._last_etag
+                else:
+                    self._poll_headers.pop('If-None-Match', None)
+                response = self._session.get(self.status_endpoint, timeout=self.poll_timeout, headers=self._poll_headers)
                 
-                if response.status_code == 200:
-                    status = response.json()
-                    logger.debug(f"Activity status: {status}")
+                if response.status_code == 304:
+                    # Status unchanged since the last poll, nothing to handle
+                    logger.debug("Activity status not modified")
+                elif response.status_code == 200 and not response.content:
+                    # Nothing to parse, don't take the JSON error path
+                    logger.debug("Empty activity status body")
+                elif response.status_code == 200:
+                    self._last_etag = response.headers.get('ETag')
+                    status = _json_loads(response.content)
+                    logger.debug("Activity status: %s", status)
                     
-                    # Use asyncio to handle the status update
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    loop.run_until_complete(self._handle_status_update(status))
-                    loop.close()
+                    # Status handling has no awaits, so call it directly
+                    self._handle_status_update(status)
                 else:
                     logger.warning(f"Failed to get activity status: HTTP {response.status_code}")
             
@@ -355,24 +539,20 @@ class ActivityMonitor:
             except Exception as e:
                 logger.error(f"Error in activity monitor: {str(e)}")
             
-            # Wait for next poll
-            time.sleep(self.poll_interval)
+            # Poll faster right after a change, hold the base rate while an activity is running,
+            # and back off while idle
+            if self._last_payload_key != previous_payload_key:
+                idle_streak = 0
+                poll_delay = self.poll_interval / 2
+            else:
+                idle_streak += 1
+                if self.last_activity_running:
+                    poll_delay = self.poll_interval
+                else:
+                    poll_delay = min(self.poll_interval * (1 + idle_streak), self.max_poll_interval)
+            
+            # Wait for next poll, waking immediately if stop() is called
+            if self.stop_event.wait(poll_delay):
+                break
         
         logger.info("Activity monitor loop stopped")
-
-    def _mqtt_monitor_loop(self):
-        """Background thread for monitoring MQTT connection"""
-        while not self.stop_event.is_set():
-            if not self.mqtt_client.is_connected():
-                logger.warning("MQTT client disconnected, attempting to reconnect...")
-                try:
-                    self.mqtt_client.reconnect()
-                except Exception as e:
-                    logger.error(f"Failed to reconnect to MQTT: {str(e)}")
-                    time.sleep(self.poll_interval)
-            time.sleep(1)
-        
-        # Cleanup MQTT client
-        if self.mqtt_client:
-            self.mqtt_client.loop_stop()
-            self.mqtt_client.disconnect() 
\ No newline at end of file
@@ -1,18 +1,50 @@
 import os
+import re
 import logging
 import atexit
 import signal
 import json
+import mimetypes
 import time
 import zipfile
 import io
 import shutil
-from flask import Flask, jsonify, request, send_from_directory, send_file, render_template, Response, make_response
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, jsonify, request, send_from_directory, send_file, render_template, Response, make_response, url_for
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import NotFound
+from werkzeug.utils import safe_join
 from dotenv import load_dotenv
+from waitress import create_server
 from webcam_controller import WebcamController
 from activity_monitor import ActivityMonitor
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Outermost {...} in a progress file, for recovering from partial or trailing writes
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# <session_id>/<frame image>, the only shape /image serves
+IMAGE_PATH_RE = re.compile(r'([\w\-]+)/([\w\-.]+\.(?:jpg|jpeg|png))')
+
+def json_dumps(obj):
+    """Serialize obj to JSON bytes, using orjson when it's available"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+def json_loads(data):
+    """Parse JSON from str or bytes, using orjson when it's available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 # Load environment variables
 load_dotenv()
 
@@ -23,13 +55,75 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes and decodes with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Build the body straight from orjson's bytes, skipping a str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 # Create Flask app
 app = Flask(__name__, static_folder='static')
 
+# Use orjson for jsonify() and request JSON when it's available
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+
+# Let browsers cache static assets instead of re-fetching them; templates link them through
+# static_url() so an update isn't hidden behind that cache. Session files set their own max-age.
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 3600
+
+@app.template_global()
+def static_url(filename):
+    """URL of a static file, versioned by its modification time"""
+    try:
+        version = int(os.stat(os.path.join(app.static_folder, filename)).st_mtime)
+    except OSError:
+        version = 0
+    return url_for('static', filename=filename, v=version)
+
+# Frame images are write-once; videos can be recreated under the same name, so revalidate those sooner
+IMAGE_MAX_AGE = 31536000
+VIDEO_MAX_AGE = 60
+
 # Initialize webcam controller
 timelapse_dir = os.getenv('TIMELAPSE_DIR', './timelapses')
 webcam_controller = WebcamController(timelapse_dir=timelapse_dir)
 
+# Optionally hand file delivery off to a front proxy: 'nginx' (X-Accel-Redirect) or 'apache' (X-Sendfile)
+sendfile_mode = os.getenv('SENDFILE_MODE', '').strip().lower()
+sendfile_prefix = '/' + os.getenv('SENDFILE_PREFIX', '/_protected/').strip('/') + '/'
+if sendfile_mode == 'apache':
+    app.use_x_sendfile = True
+
+def serve_timelapse_file(session_id, name, mimetype=None, max_age=3600, immutable=False):
+    """Serve a file from a session directory, letting nginx send it when SENDFILE_MODE=nginx"""
+    if sendfile_mode != 'nginx':
+        # send_file emits X-Sendfile itself when app.use_x_sendfile is set
+        response = send_from_directory(os.path.join(timelapse_dir, session_id), name, mimetype=mimetype,
+                                       conditional=True, etag=True, max_age=max_age)
+    else:
+        relative_path = safe_join(session_id, name)
+        if relative_path is None or not os.path.isfile(os.path.join(timelapse_dir, relative_path)):
+            raise NotFound()
+        # nginx keeps this Content-Type for the redirected file, so it has to be the file's real type
+        response = Response(mimetype=mimetype or mimetypes.guess_type(name)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = sendfile_prefix + relative_path.replace(os.sep, '/')
+        response.cache_control.max_age = max_age
+    
+    response.cache_control.public = True
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
 # State file path
 state_file_path = 'state.json'
 
@@ -37,14 +131,19 @@ state_file_path = 'state.json'
 poll_interval = int(os.getenv('POLL_INTERVAL', '5'))
 activity_monitor = ActivityMonitor(webcam_controller, poll_interval=poll_interval)
 
+# Video encodes run here so /create_video can return right away
+video_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='video')
+video_jobs = {}  # session_id -> Future of the encode
+video_jobs_lock = threading.Lock()
+
 # Load state from file
 def load_state():
     """Load state from state.json file"""
     try:
         if os.path.exists(state_file_path):
-            with open(state_file_path, 'r') as f:
-                state = json.load(f)
-                logger.info(f"Loaded state: {state}")
+            with open(state_file_path, 'rb') as f:
+                state = json_loads(f.read())
+                logger.info("Loaded state: %s", state)
                 
                 # Apply state to webcam controller
                 if 'auto_mode' in state:
@@ -70,27 +169,115 @@ def load_state():
         logger.error(f"Error loading state: {str(e)}")
         return {'auto_mode': False, 'ignored_patterns': []}
 
-# Save state to file
-def save_state(state):
-    """Save state to state.json file"""
+# Serialized form of the last state written, used to skip redundant writes
+last_saved_state = None
+
+# Write state to file
+def write_state(state):
+    """Write state to state.json file"""
+    global last_saved_state
     try:
-        with open(state_file_path, 'w') as f:
-            json.dump(state, f)
-        logger.info(f"Saved state: {state}")
+        data = json_dumps(state)
+        if data == last_saved_state:
+            logger.debug("State unchanged, skipping save")
+            return True
+        
+        # Write to a temp file and rename so a crash mid-write can't corrupt the state file
+        temp_path = f"{state_file_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, state_file_path)
+        last_saved_state = data
+        logger.info("Saved state: %s", state)
         return True
     except Exception as e:
         logger.error(f"Error saving state: {str(e)}")
         return False
 
-# Load initial state
-initial_state = load_state()
+# Holds at most one pending snapshot; newer saves replace it so bursts collapse into one write
+state_queue = queue.Queue(maxsize=1)
+state_queue_lock = threading.Lock()
+
+def state_writer():
+    """Background thread that writes queued state snapshots"""
+    while True:
+        state = state_queue.get()
+        try:
+            write_state(state)
+        finally:
+            state_queue.task_done()
+
+def save_state(state):
+    """Queue state to be written to state.json by the background writer"""
+    with state_queue_lock:
+        try:
+            state_queue.get_nowait()
+            state_queue.task_done()
+        except queue.Empty:
+            pass
+        state_queue.put_nowait(state)
+
+def flush_state():
+    """Block until every queued state snapshot has been written"""
+    state_queue.join()
+
+def snapshot_state():
+    """Build the persisted state dict from the current controller and monitor settings"""
+    return {
+        'auto_mode': webcam_controller.auto_mode,
+        'camera': webcam_controller.selected_camera,
+        'interval': webcam_controller.interval,
+        'is_capturing': webcam_controller.is_capturing,
+        'current_session': webcam_controller.current_session_id,
+        'camera_settings': webcam_controller.camera_settings,
+        'ignored_patterns': activity_monitor.ignored_patterns
+    }
+
+# Short-lived cache of list_sessions(), which walks every session directory
+sessions_cache = {'time': 0.0, 'sessions': None}
+SESSIONS_CACHE_TTL = 1.0
+
+def cached_sessions():
+    """Return list_sessions(), reusing the result for up to SESSIONS_CACHE_TTL seconds"""
+    now = time.monotonic()
+    if sessions_cache['sessions'] is None or now - sessions_cache['time'] > SESSIONS_CACHE_TTL:
+        sessions_cache['sessions'] = webcam_controller.list_sessions()
+        sessions_cache['time'] = now
+    return sessions_cache['sessions']
+
+def invalidate_sessions_cache():
+    """Force the next cached_sessions() call to rescan"""
+    sessions_cache['sessions'] = None
+
+initial_state = None
+init_lock = threading.Lock()
 
-# Only start activity monitor if auto_mode is enabled in the initial state
-if initial_state and initial_state.get('auto_mode', False):
-    logger.info("Auto mode enabled in initial state, starting activity monitor")
-    activity_monitor.start()
-else:
-    logger.info("Auto mode disabled in initial state, activity monitor not started")
+def init_once():
+    """Load saved state and start background work, once per process"""
+    global initial_state
+    with init_lock:
+        if initial_state is not None:
+            return
+        
+        threading.Thread(target=state_writer, daemon=True, name='state-writer').start()
+        
+        # Load initial state
+        initial_state = load_state()
+        
+        # Only start activity monitor if auto_mode is enabled in the initial state
+        if initial_state.get('auto_mode', False):
+            logger.info("Auto mode enabled in initial state, starting activity monitor")
+            activity_monitor.start()
+        else:
+            logger.info("Auto mode disabled in initial state, activity monitor not started")
+
+@app.before_request
+def ensure_initialized():
+    """Initialize on the first request when served by something other than main()"""
+    if initial_state is None:
+        init_once()
 
 
 @app.route('/')
@@ -98,24 +285,28 @@ def index():
     """Serve the main page"""
     return render_template('index.html')
 
+def build_status():
+    """Controller status plus the activity monitor's current file"""
+    status = webcam_controller.get_status()
+    
+    # Add current file information from activity monitor if available
+    current_file = activity_monitor.last_current_file
+    if current_file:
+        status['current_file'] = current_file
+        
+        # Add information about whether this activity is being ignored (memoized per file by the monitor)
+        status['is_ignored'] = activity_monitor.is_ignored_activity(current_file)
+    
+    return status
+
 @app.route('/status', methods=['GET'])
 def get_status():
     """Get current timelapse status"""
     try:
-        status = webcam_controller.get_status()
-        
-        # Add current file information from activity monitor if available
-        if hasattr(activity_monitor, 'last_current_file') and activity_monitor.last_current_file:
-            status['current_file'] = activity_monitor.last_current_file
-            
-            # Add information about whether this activity is being ignored
-            if activity_monitor.is_ignored_activity(activity_monitor.last_current_file):
-                status['is_ignored'] = True
-            else:
-                status['is_ignored'] = False
+        status = build_status()
         
         # Include sessions data to avoid a separate API call
-        status['sessions'] = webcam_controller.list_sessions()
+        status['sessions'] = cached_sessions()
         
         return jsonify(status)
     except Exception as e:
@@ -126,7 +317,9 @@ def get_status():
 def list_cameras():
     """List available cameras"""
     try:
-        cameras = webcam_controller.scan_cameras()
+        refresh = request.args.get('refresh') == '1'
+        # scan_cameras() caches device detection itself and notices hotplugged cameras
+        cameras = webcam_controller.scan_cameras(force=refresh)
         return jsonify({"cameras": cameras})
     except Exception as e:
         logger.error(f"Error listing cameras: {str(e)}")
@@ -136,7 +329,7 @@ def list_cameras():
 def pre_initialize_camera():
     """Pre-initialize a camera for faster first capture"""
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         camera = data.get('camera')
         
         # Pre-initialize the camera
@@ -151,7 +344,7 @@ def pre_initialize_camera():
 def start_timelapse():
     """Start timelapse capture"""
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         camera = data.get('camera')
         interval = data.get('interval')
         auto_mode = data.get('auto_mode')
@@ -162,9 +355,10 @@ def start_timelapse():
             activity_file = activity_monitor.last_current_file
         
         result = webcam_controller.start_timelapse(camera, interval, auto_mode, activity_file)
+        invalidate_sessions_cache()
         if result:
             # Get the current session ID from the webcam controller
-            current_session = os.path.basename(webcam_controller.current_session_dir) if webcam_controller.current_session_dir else None
+            current_session = webcam_controller.current_session_id
             return jsonify({"success": True, "session_id": current_session})
         else:
             return jsonify({"success": False, "error": "Failed to start timelapse"}), 400
@@ -177,6 +371,7 @@ def stop_timelapse():
     """Stop timelapse capture"""
     try:
         result = webcam_controller.stop_timelapse()
+        invalidate_sessions_cache()
         if result:
             return jsonify({"success": True})
         else:
@@ -189,7 +384,7 @@ def stop_timelapse():
 def list_timelapse_sessions():
     """List all timelapse sessions"""
     try:
-        sessions = webcam_controller.list_sessions()
+        sessions = cached_sessions()
         return jsonify({"sessions": sessions})
     except Exception as e:
         logger.error(f"Error listing timelapse sessions: {str(e)}")
@@ -205,11 +400,47 @@ def get_session_frames(session_id):
         logger.error(f"Error getting session frames: {str(e)}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+def report_video_progress(session_id, data):
+    """Publish a progress update on behalf of a job and record it in the session's progress file"""
+    webcam_controller.publish_progress(session_id, data)
+    progress_file = os.path.join(timelapse_dir, session_id, "video_progress.json")
+    try:
+        # Swap in a complete file so /video_progress never reads a partial one
+        temp_path = f"{progress_file}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(json_dumps(data))
+        os.replace(temp_path, progress_file)
+    except OSError as e:
+        logger.error(f"Error writing progress data: {str(e)}")
+
+def run_video_job(session_id, session_dir, fps):
+    """Create a session's video on the executor and report failures create_video didn't"""
+    try:
+        result = webcam_controller.create_video(session_dir, fps)
+    except Exception as e:
+        logger.error(f"Error creating timelapse video: {str(e)}")
+        result = False
+    invalidate_sessions_cache()
+    
+    # create_video reports its own failures with details (e.g. ffmpeg's error output); only cover the rest
+    latest = webcam_controller.get_video_progress(session_id) or {}
+    if (not (isinstance(result, dict) and (result.get('success') or result.get('cancelled')))
+            and latest.get('status') != 'failed'):
+        report_video_progress(session_id, {
+            'status': 'failed',
+            'progress': 0,
+            'error': 'Failed to create video'
+        })
+    
+    with video_jobs_lock:
+        video_jobs.pop(session_id, None)
+    return result
+
 @app.route('/create_video', methods=['POST'])
 def create_timelapse_video():
     """Create a timelapse video from captured frames"""
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         session_id = data.get('session_id')
         fps = data.get('fps', 30)
         
@@ -218,37 +449,42 @@ def create_timelapse_video():
             return jsonify({"success": False, "error": "Session ID is required"}), 400
         
         # Check if this is the active session
-        current_session = os.path.basename(webcam_controller.current_session_dir) if webcam_controller.current_session_dir else None
+        current_session = webcam_controller.current_session_id
         if session_id == current_session and webcam_controller.is_capturing:
             return jsonify({"success": False, "error": "Cannot create video while capture is in progress"}), 400
         
         # Create session directory path
         session_dir = os.path.join(timelapse_dir, session_id)
         
+        if not os.path.isdir(session_dir):
+            return jsonify({"success": False, "error": "Session not found"}), 404
+        
         # Check if video already exists
         video_file = os.path.join(session_dir, f"timelapse_{session_id}.mp4")
         video_existed = os.path.exists(video_file)
         
-        # Create video
-        result = webcam_controller.create_video(session_dir, fps)
+        with video_jobs_lock:
+            job = video_jobs.get(session_id)
+            if job and not job.done():
+                return jsonify({"success": False, "error": "Video creation is already in progress"}), 409
+            
+            # Drop the previous run's progress so pollers don't see its final status
+            webcam_controller.clear_video_progress(session_id)
+            try:
+                os.remove(os.path.join(session_dir, "video_progress.json"))
+            except FileNotFoundError:
+                pass
+            
+            # Encode in the background; progress arrives via /video_progress or its stream
+            video_jobs[session_id] = video_executor.submit(run_video_job, session_id, session_dir, fps)
         
-        if result and isinstance(result, dict) and result.get('success'):
-            video_path = result.get('video_path')
-            return jsonify({
-                "success": True,
-                "video_path": os.path.basename(video_path),
-                "video_url": f"/video/{session_id}",
-                "frame_count": result.get('frame_count', 0),
-                "video_existed": video_existed
-            })
-        elif result and isinstance(result, dict) and result.get('cancelled'):
-            return jsonify({
-                "success": False,
-                "cancelled": True,
-                "message": result.get('message', 'Video creation was cancelled')
-            })
-        else:
-            return jsonify({"success": False, "error": "Failed to create video"}), 400
+        return jsonify({
+            "success": True,
+            "status": "started",
+            "job_id": session_id,
+            "video_url": f"/video/{session_id}",
+            "video_existed": video_existed
+        }), 202
     except Exception as e:
         logger.error(f"Error creating timelapse video: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -257,16 +493,15 @@ def create_timelapse_video():
 def get_timelapse_image(filename):
     """Serve a timelapse image"""
     try:
-        # Split the path into directory and filename
-        parts = filename.split('/')
-        if len(parts) < 2:
+        # Only accept a flat session/frame path, which also rules out traversal
+        match = IMAGE_PATH_RE.fullmatch(filename)
+        if not match:
             return jsonify({"error": "Invalid image path"}), 400
         
-        session_id = parts[0]
-        image_name = parts[-1]
+        session_id, image_name = match.groups()
         
-        # Serve the file from the timelapse directory
-        return send_from_directory(os.path.join(timelapse_dir, session_id), image_name)
+        # Frames are never rewritten under the same name, so browsers can keep them indefinitely
+        return serve_timelapse_file(session_id, image_name, max_age=IMAGE_MAX_AGE, immutable=True)
     except Exception as e:
         logger.error(f"Error serving image: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -274,68 +509,111 @@ def get_timelapse_image(filename):
 @app.route('/video/<session_id>', methods=['GET'])
 def get_timelapse_video(session_id):
     """Serve a timelapse video"""
-    video_path = os.path.join(timelapse_dir, session_id, f"timelapse_{session_id}.mp4")
-    if os.path.exists(video_path):
-        return send_file(video_path, mimetype='video/mp4')
-    else:
+    try:
+        # Conditional so range requests while scrubbing only send the requested bytes
+        response = serve_timelapse_file(session_id, f"timelapse_{session_id}.mp4", mimetype='video/mp4',
+                                        max_age=VIDEO_MAX_AGE)
+    except NotFound:
         return jsonify({"error": "Video not found"}), 404
+    return response
+
+def add_elapsed_seconds(progress_data):
+    """Fill in elapsed_seconds for a run that is still going, if the update didn't include it"""
+    if 'start_time' in progress_data and 'elapsed_seconds' not in progress_data:
+        # Don't calculate elapsed time for completed videos
+        if progress_data.get('status') != 'completed':
+            current_time = time.time()
+            start_time = progress_data['start_time']
+            progress_data['elapsed_seconds'] = current_time - start_time
+            logger.debug(f"Calculated elapsed time: {progress_data['elapsed_seconds']}s")
+    return progress_data
+
+def read_video_progress(session_id):
+    """Get the video progress for a session, returning (progress data, HTTP status)
+    
+    Runs since this process started are answered from memory; the progress file covers older ones.
+    """
+    progress_data = webcam_controller.get_video_progress(session_id)
+    if progress_data is not None:
+        return add_elapsed_seconds(progress_data), 200
+    
+    progress_file = os.path.join(timelapse_dir, session_id, "video_progress.json")
+    try:
+        # Read the file content first
+        with open(progress_file, 'r') as f:
+            file_content = f.read().strip()
+        
+        # Try to parse the JSON
+        try:
+            progress_data = json.loads(file_content)
+        except json.JSONDecodeError as json_err:
+            logger.error(f"JSON decode error in progress file: {str(json_err)}")
+            logger.debug(f"Raw content: {file_content}")
+            
+            # Try to extract valid JSON if possible
+            try:
+                # Look for a complete JSON object by finding matching braces
+                match = JSON_OBJECT_RE.search(file_content)
+                if match:
+                    progress_data = json.loads(match.group(0))
+                else:
+                    # Return a default progress object
+                    return {"status": "processing", "progress": 50, "error": "Invalid progress data format"}, 200
+            except Exception as extract_err:
+                logger.error(f"Failed to extract valid JSON: {str(extract_err)}")
+                return {"status": "processing", "progress": 50, "error": "Invalid progress data"}, 200
+        
+        # Calculate elapsed time if not already provided
+        return add_elapsed_seconds(progress_data), 200
+    except FileNotFoundError:
+        return {"status": "unknown", "progress": 0}, 404
+    except Exception as file_err:
+        logger.error(f"Error reading progress file: {str(file_err)}")
+        return {"status": "unknown", "progress": 0, "error": "Error reading progress data"}, 200
 
 @app.route('/video_progress/<session_id>', methods=['GET'])
 def get_video_progress(session_id):
     """Get the progress of video creation for a session"""
     try:
-        progress_file = os.path.join(timelapse_dir, session_id, "video_progress.json")
-        if os.path.exists(progress_file):
-            try:
-                # Read the file content first
-                with open(progress_file, 'r') as f:
-                    file_content = f.read().strip()
-                
-                # Try to parse the JSON
-                try:
-                    progress_data = json.loads(file_content)
-                except json.JSONDecodeError as json_err:
-                    logger.error(f"JSON decode error in progress file: {str(json_err)}")
-                    logger.debug(f"Raw content: {file_content}")
-                    
-                    # Try to extract valid JSON if possible
-                    try:
-                        # Look for a complete JSON object by finding matching braces
-                        import re
-                        match = re.search(r'(\{.*\})', file_content)
-                        if match:
-                            progress_data = json.loads(match.group(1))
-                        else:
-                            # Return a default progress object
-                            return jsonify({"status": "processing", "progress": 50, "error": "Invalid progress data format"})
-                    except Exception as extract_err:
-                        logger.error(f"Failed to extract valid JSON: {str(extract_err)}")
-                        return jsonify({"status": "processing", "progress": 50, "error": "Invalid progress data"})
-                
-                # Calculate elapsed time if not already provided
-                if 'start_time' in progress_data and 'elapsed_seconds' not in progress_data:
-                    # Don't calculate elapsed time for completed videos
-                    if progress_data.get('status') != 'completed':
-                        current_time = time.time()
-                        start_time = progress_data['start_time']
-                        progress_data['elapsed_seconds'] = current_time - start_time
-                        logger.debug(f"Calculated elapsed time: {progress_data['elapsed_seconds']}s")
-                
-                return jsonify(progress_data)
-            except Exception as file_err:
-                logger.error(f"Error reading progress file: {str(file_err)}")
-                return jsonify({"status": "unknown", "progress": 0, "error": "Error reading progress data"})
-        else:
-            return jsonify({"status": "unknown", "progress": 0}), 404
+        progress_data, status_code = read_video_progress(session_id)
+        return jsonify(progress_data), status_code
     except Exception as e:
         logger.error(f"Error getting video progress: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/video_progress_stream/<session_id>', methods=['GET'])
+def stream_video_progress(session_id):
+    """Stream video creation progress for a session as server-sent events"""
+    progress_queue = webcam_controller.subscribe_progress(session_id)
+    
+    def generate():
+        try:
+            # Send something right away so the client's stream opens before any progress exists
+            yield ": connected\n\n"
+            while True:
+                try:
+                    payload = progress_queue.get(timeout=30)
+                except queue.Empty:
+                    # Keep-alive comment so a disconnected client is noticed and proxies don't time out
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                yield f"data: {payload}\n\n"
+                if json_loads(payload).get('status') in ('completed', 'failed', 'cancelled'):
+                    break
+        finally:
+            webcam_controller.unsubscribe_progress(session_id, progress_queue)
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/test_capture', methods=['POST'])
 def test_timelapse_capture():
     """Capture a test frame and return it as base64"""
     try:
-        data = request.json
+        data = request.get_json(silent=True)
         if not data:
             logger.error("No JSON data received in test_capture request")
             return jsonify({"success": False, "error": "No JSON data received"}), 400
@@ -343,9 +621,6 @@ def test_timelapse_capture():
         camera = data.get('camera')
         logger.info(f"Test capture requested for camera: {camera}")
         
-        # Get available cameras to help with troubleshooting
-        available_cameras = webcam_controller.scan_cameras()
-        
         # Capture test frame
         try:
             base64_image = webcam_controller.test_capture(camera)
@@ -354,10 +629,11 @@ def test_timelapse_capture():
                 logger.info(f"Successfully captured test frame from camera: {camera}")
                 return jsonify({
                     "success": True,
-                    "image": base64_image,
-                    "available_cameras": available_cameras
+                    "image": base64_image
                 })
             else:
+                # Include available cameras to help with troubleshooting
+                available_cameras = webcam_controller.scan_cameras()
                 logger.error(f"Failed to capture test frame from camera: {camera}. Available cameras: {available_cameras}")
                 
                 return jsonify({
@@ -386,6 +662,7 @@ def delete_timelapse_session(session_id):
     """Delete a timelapse session"""
     try:
         result = webcam_controller.delete_session(session_id)
+        invalidate_sessions_cache()
         if result:
             return jsonify({"success": True})
         else:
@@ -398,7 +675,7 @@ def delete_timelapse_session(session_id):
 def update_camera_settings():
     """Update camera settings"""
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         
         # Validate required fields
         required_fields = ['brightness', 'contrast', 'exposure']
@@ -450,19 +727,10 @@ def manage_state():
     try:
         if request.method == 'GET':
             # Return current state
-            state = {
-                'auto_mode': webcam_controller.auto_mode,
-                'camera': webcam_controller.selected_camera,
-                'interval': webcam_controller.interval,
-                'is_capturing': webcam_controller.is_capturing,
-                'current_session': os.path.basename(webcam_controller.current_session_dir) if webcam_controller.current_session_dir else None,
-                'camera_settings': webcam_controller.camera_settings,
-                'ignored_patterns': activity_monitor.ignored_patterns
-            }
-            return jsonify(state)
+            return jsonify(snapshot_state())
         else:
             # Update state
-            data = request.json
+            data = request.get_json(silent=True) or {}
             
             # Update webcam controller state
             if 'auto_mode' in data:
@@ -482,15 +750,7 @@ def manage_state():
                 activity_monitor.set_ignored_patterns(data['ignored_patterns'])
             
             # Save state to file
-            state = {
-                'auto_mode': webcam_controller.auto_mode,
-                'camera': webcam_controller.selected_camera,
-                'interval': webcam_controller.interval,
-                'is_capturing': webcam_controller.is_capturing,
-                'current_session': os.path.basename(webcam_controller.current_session_dir) if webcam_controller.current_session_dir else None,
-                'camera_settings': webcam_controller.camera_settings,
-                'ignored_patterns': activity_monitor.ignored_patterns
-            }
+            state = snapshot_state()
             save_state(state)
 
             if webcam_controller.auto_mode:
@@ -510,6 +770,21 @@ def cancel_video_creation(session_id):
         if not session_id:
             return jsonify({"success": False, "error": "Session ID is required"}), 400
             
+        # A job still queued behind other encodes can simply be dropped
+        with video_jobs_lock:
+            job = video_jobs.get(session_id)
+            if job and job.cancel():
+                del video_jobs[session_id]
+                report_video_progress(session_id, {
+                    'status': 'cancelled',
+                    'progress': 0,
+                    'error': 'Video creation was cancelled by user'
+                })
+                return jsonify({
+                    "success": True,
+                    "message": "Video creation cancelled successfully"
+                })
+        
         # Call the cancel method
         result = webcam_controller.cancel_video(session_id)
         
@@ -534,7 +809,8 @@ def download_timelapse_video(session_id):
         video_path = os.path.join(timelapse_dir, session_id, f"timelapse_{session_id}.mp4")
         if os.path.exists(video_path):
             # Set the appropriate headers for file download
-            response = make_response(send_file(video_path, mimetype='video/mp4'))
+            # Recreating a video reuses this URL, so follow /video's short max-age rather than the static default
+            response = make_response(send_file(video_path, mimetype='video/mp4', max_age=VIDEO_MAX_AGE))
             response.headers['Content-Disposition'] = f'attachment; filename=timelapse_{session_id}.mp4'
             return response
         else:
@@ -576,7 +852,8 @@ def download_frames_zip(session_id):
                 mimetype='application/zip',
                 as_attachment=True,
                 download_name=f"{session_id}_frames.zip",
-                conditional=True  # Enable conditional responses
+                conditional=True,  # Enable conditional responses
+                max_age=0  # The zip is rebuilt under the same name when frames change
             )
         else:
             # If forcing a new ZIP and an old one exists, delete it first
@@ -619,7 +896,8 @@ def download_frames_zip(session_id):
                 mimetype='application/zip',
                 as_attachment=True,
                 download_name=f"{session_id}_frames.zip",
-                conditional=True  # Enable conditional responses
+                conditional=True,  # Enable conditional responses
+                max_age=0  # The zip is rebuilt under the same name when frames change
             )
     except Exception as e:
         logger.error(f"Error creating frames zip: {str(e)}")
@@ -685,25 +963,30 @@ def check_zip_exists(session_id):
         logger.error(f"Error checking if ZIP exists: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# Set once shutdown begins so on_exit runs only once (signal handler and atexit both call it)
+shutdown_event = threading.Event()
+
+# Set by the signal handler; main() waits on it to stop the server and run on_exit
+stop_requested = threading.Event()
+
 def on_exit():
     """Function to execute on application shutdown"""
+    if shutdown_event.is_set():
+        return
+    shutdown_event.set()
     logger.info("Shutting down Timelapser gracefully")
     
+    # Stop the activity monitor first so it can't start a capture while we clean up
+    if activity_monitor.is_running():
+        activity_monitor.stop()
+    
     # Save current state
-    state = {
-        'auto_mode': webcam_controller.auto_mode,
-        'camera': webcam_controller.selected_camera,
-        'interval': webcam_controller.interval,
-        'is_capturing': webcam_controller.is_capturing,
-        'current_session': os.path.basename(webcam_controller.current_session_dir) if webcam_controller.current_session_dir else None,
-        'camera_settings': webcam_controller.camera_settings,
-        'ignored_patterns': activity_monitor.ignored_patterns
-    }
-    save_state(state)
+    save_state(snapshot_state())
+    flush_state()
     logger.info("Final state saved")
     
-    # Stop activity monitor
-    activity_monitor.stop()
+    # Drop queued encodes; cleanup() terminates any ffmpeg that's already running
+    video_executor.shutdown(wait=False, cancel_futures=True)
     
     # Clean up webcam controller resources
     webcam_controller.cleanup()
@@ -712,9 +995,9 @@ def on_exit():
 
 def signal_handler(sig, frame):
     """Signal handler for graceful shutdown"""
+    # Only flag the request here; the actual cleanup takes locks, which isn't safe in signal context
     logger.info(f"Received signal {sig}, shutting down...")
-    on_exit()
-    os._exit(0)
+    stop_requested.set()
 
 def main():
     """Main entry point for the application"""
@@ -723,15 +1006,33 @@ def main():
     # Register the on_exit function
     atexit.register(on_exit)
     
+    # Load state and start the activity monitor before accepting requests
+    init_once()
+    
+    # Get port from environment or use default
+    port = int(os.getenv('PORT', '5001'))
+    
+    if os.getenv('FLASK_DEV', '0') == '1':
+        # Werkzeug's development server, for local debugging only
+        app.run(host='0.0.0.0', port=port, debug=False)
+        return
+    
     # Register signal handlers for graceful shutdown
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
     
-    # Get port from environment or use default
-    port = int(os.getenv('PORT', '5001'))
+    # Serve with waitress so media downloads don't block status polling
+    threads = int(os.getenv('WEB_THREADS', '8'))
+    server = create_server(app, host='0.0.0.0', port=port, threads=threads, connection_limit=200)
+    server_thread = threading.Thread(target=server.run, daemon=True, name='waitress')
+    server_thread.start()
+    
+    # Wait with a timeout so the main thread stays responsive to signals on every platform
+    while not stop_requested.wait(1):
+        pass
     
-    # Run the Flask app
-    app.run(host='0.0.0.0', port=port, debug=False)
+    server.close()
+    on_exit()
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -1344,36 +1344,69 @@ async function createVideo() {
         
         // Start progress tracking
         let progressTrackingId = null;
+        let progressSource = null;
         
         try {
-            // Start the video creation process
-            const createVideoRequest = fetch('/create_video', {
+            const sessionId = currentSessionId;
+            
+            // Resolves with the final progress update once the background encode finishes
+            let resolveFinished;
+            const finished = new Promise(resolve => { resolveFinished = resolve; });
+            
+            // Poll for progress until the encode finishes
+            const startPolling = () => {
+                if (progressTrackingId) {
+                    return;
+                }
+                progressTrackingId = setInterval(async () => {
+                    const progressData = await trackVideoProgress(sessionId);
+                    if (progressData) {
+                        clearInterval(progressTrackingId);
+                        resolveFinished(progressData);
+                    }
+                }, 1000); // Check progress every second
+            };
+            
+            // Start the video creation process; the server answers as soon as the encode is queued
+            const response = await fetch('/create_video', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
                 },
                 body: JSON.stringify({
-                    session_id: currentSessionId,
+                    session_id: sessionId,
                     fps: parseInt(fpsInput.value)
                 })
             });
+            const data = await response.json();
             
-            // Start tracking progress immediately
-            progressTrackingId = setInterval(async () => {
-                const isCompleted = await trackVideoProgress(currentSessionId);
-                if (isCompleted) {
-                    clearInterval(progressTrackingId);
-                    
-                    // Hide cancel button when completed
-                    if (cancelVideoButton) {
-                        cancelVideoButton.classList.add('hidden');
-                    }
+            if (data.success) {
+                // Stream progress from the server when supported; the stream opens with the job's latest update,
+                // so one that already finished is still reported
+                if (window.EventSource) {
+                    progressSource = new EventSource(`/video_progress_stream/${sessionId}`);
+                    progressSource.onmessage = (event) => {
+                        const progressData = JSON.parse(event.data);
+                        if (renderVideoProgress(progressData)) {
+                            progressSource.close();
+                            resolveFinished(progressData);
+                        }
+                    };
+                    progressSource.onerror = () => {
+                        // Don't rely on the browser reconnecting, fall back to polling
+                        progressSource.close();
+                        startPolling();
+                    };
+                } else {
+                    startPolling();
                 }
-            }, 1000); // Check progress every second
+            }
             
-            // Wait for the request to complete
-            const response = await createVideoRequest;
-            const data = await response.json();
+            const result = data.success ? await finished : null;
+            
+            if (progressSource) {
+                progressSource.close();
+            }
             
             // Hide loading spinner and enable button
             videoLoading.classList.add('hidden');
@@ -1384,14 +1417,16 @@ async function createVideo() {
                 cancelVideoButton.classList.add('hidden');
             }
             
-            if (data.success) {
+            if (!data.success) {
+                alert('Failed to create video: ' + (data.error || 'Unknown error'));
+            } else if (result.status === 'completed') {
                 // Show the video container
                 document.getElementById('video-container').classList.remove('hidden');
                 
                 // Add timestamp to video URL to prevent caching
                 const timestamp = new Date().getTime();
                 const videoPlayer = document.getElementById('video-player');
-                videoPlayer.src = `/video/${currentSessionId}?t=${timestamp}`;  // Use the /video endpoint instead of direct path
+                videoPlayer.src = `/video/${sessionId}?t=${timestamp}`;  // Use the /video endpoint instead of direct path
                 
                 // Reset video player
                 videoPlayer.load();
@@ -1404,19 +1439,14 @@ async function createVideo() {
                 
                 // Show success message
                 if (data.video_existed) {
-                    alert(`Video successfully recreated with ${data.frame_count} frames.`);
+                    alert(`Video successfully recreated with ${result.total_frames} frames.`);
                 } else {
-                    alert(`Video successfully created with ${data.frame_count} frames.`);
-                }
-            } else if (data.cancelled) {
-                alert(data.message || 'Video creation was cancelled.');
-                
-                // Clear the progress tracking
-                if (progressTrackingId) {
-                    clearInterval(progressTrackingId);
+                    alert(`Video successfully created with ${result.total_frames} frames.`);
                 }
+            } else if (result.status === 'cancelled') {
+                alert('Video creation was cancelled.');
             } else {
-                alert('Failed to create video: ' + (data.error || 'Unknown error'));
+                alert('Failed to create video: ' + (result.error || 'Unknown error'));
             }
         } catch (error) {
             console.error('Error creating video:', error);
@@ -1435,6 +1465,9 @@ async function createVideo() {
             if (progressTrackingId) {
                 clearInterval(progressTrackingId);
             }
+            if (progressSource) {
+                progressSource.close();
+            }
         }
     } catch (error) {
         console.error('Error creating video:', error);
@@ -1496,12 +1529,76 @@ async function cancelVideoCreation() {
     }
 }
 
-// Track video creation progress
-async function trackVideoProgress(sessionId) {
+// Show a video progress update, returning true once video creation has finished
+function renderVideoProgress(data) {
     const progressBar = document.getElementById('video-progress-bar');
     const progressText = document.getElementById('video-progress-text');
     const statusText = document.getElementById('video-status-text');
     
+    // Update progress bar
+    const progress = Math.round(data.progress || 0);
+    progressBar.style.width = `${progress}%`;
+    progressText.textContent = `${progress}%`;
+    
+    // Calculate elapsed time - prefer elapsed_seconds if available
+    let elapsedText = '';
+    if (data.elapsed_seconds) {
+        const elapsed = Math.round(data.elapsed_seconds);
+        elapsedText = ` (${elapsed}s elapsed)`;
+    } else if (data.start_time) {
+        const elapsed = Math.round((Date.now() / 1000) - data.start_time);
+        elapsedText = ` (${elapsed}s elapsed)`;
+    }
+    
+    // Update status text with more detailed information
+    if (data.status === 'completed') {
+        statusText.textContent = 'Video creation completed!' + elapsedText;
+        
+        // Hide cancel button
+        const cancelVideoButton = document.getElementById('cancel-video-button');
+        if (cancelVideoButton) {
+            cancelVideoButton.classList.add('hidden');
+        }
+        
+        return true; // Signal completion
+    } else if (data.status === 'failed') {
+        statusText.textContent = `Failed: ${data.error || 'Unknown error'}` + elapsedText;
+        
+        // Hide cancel button
+        const cancelVideoButton = document.getElementById('cancel-video-button');
+        if (cancelVideoButton) {
+            cancelVideoButton.classList.add('hidden');
+        }
+        
+        return true; // Signal completion (with error)
+    } else if (data.status === 'cancelled') {
+        statusText.textContent = `Cancelled: ${data.error || 'Video creation was cancelled'}` + elapsedText;
+        
+        // Hide cancel button
+        const cancelVideoButton = document.getElementById('cancel-video-button');
+        if (cancelVideoButton) {
+            cancelVideoButton.classList.add('hidden');
+        }
+        
+        return true; // Signal completion (cancelled)
+    } else if (data.status === 'processing') {
+        // Show more detailed progress information
+        if (data.frame && data.total_frames) {
+            statusText.textContent = `Processing: Frame ${data.frame}/${data.total_frames}${elapsedText}`;
+        } else {
+            statusText.textContent = `Processing video...${elapsedText}`;
+        }
+    } else {
+        statusText.textContent = `Creating video...${elapsedText}`;
+    }
+    
+    return false; // Not completed
+}
+
+// Poll video creation progress, returning the final progress data once it has finished
+async function trackVideoProgress(sessionId) {
+    const statusText = document.getElementById('video-status-text');
+    
     try {
         const response = await fetch(`/video_progress/${sessionId}`);
         if (response.ok) {
@@ -1525,62 +1622,7 @@ async function trackVideoProgress(sessionId) {
                     };
                 }
                 
-                // Update progress bar
-                const progress = Math.round(data.progress || 0);
-                progressBar.style.width = `${progress}%`;
-                progressText.textContent = `${progress}%`;
-                
-                // Calculate elapsed time - prefer elapsed_seconds if available
-                let elapsedText = '';
-                if (data.elapsed_seconds) {
-                    const elapsed = Math.round(data.elapsed_seconds);
-                    elapsedText = ` (${elapsed}s elapsed)`;
-                } else if (data.start_time) {
-                    const elapsed = Math.round((Date.now() / 1000) - data.start_time);
-                    elapsedText = ` (${elapsed}s elapsed)`;
-                }
-                
-                // Update status text with more detailed information
-                if (data.status === 'completed') {
-                    statusText.textContent = 'Video creation completed!' + elapsedText;
-                    
-                    // Hide cancel button
-                    const cancelVideoButton = document.getElementById('cancel-video-button');
-                    if (cancelVideoButton) {
-                        cancelVideoButton.classList.add('hidden');
-                    }
-                    
-                    return true; // Signal completion
-                } else if (data.status === 'failed') {
-                    statusText.textContent = `Failed: ${data.error || 'Unknown error'}` + elapsedText;
-                    
-                    // Hide cancel button
-                    const cancelVideoButton = document.getElementById('cancel-video-button');
-                    if (cancelVideoButton) {
-                        cancelVideoButton.classList.add('hidden');
-                    }
-                    
-                    return true; // Signal completion (with error)
-                } else if (data.status === 'cancelled') {
-                    statusText.textContent = `Cancelled: ${data.error || 'Video creation was cancelled'}` + elapsedText;
-                    
-                    // Hide cancel button
-                    const cancelVideoButton = document.getElementById('cancel-video-button');
-                    if (cancelVideoButton) {
-                        cancelVideoButton.classList.add('hidden');
-                    }
-                    
-                    return true; // Signal completion (cancelled)
-                } else if (data.status === 'processing') {
-                    // Show more detailed progress information
-                    if (data.frame && data.total_frames) {
-                        statusText.textContent = `Processing: Frame ${data.frame}/${data.total_frames}${elapsedText}`;
-                    } else {
-                        statusText.textContent = `Processing video...${elapsedText}`;
-                    }
-                } else {
-                    statusText.textContent = `Creating video...${elapsedText}`;
-                }
+                return renderVideoProgress(data) ? data : null;
             } catch (error) {
                 console.error('Error processing response:', error);
                 statusText.textContent = 'Creating video... (status unknown)';
@@ -1590,7 +1632,7 @@ async function trackVideoProgress(sessionId) {
         console.error('Error tracking progress:', error);
     }
     
-    return false; // Not completed
+    return null; // Not completed
 }
 
 // Delete session
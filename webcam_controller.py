@@ -6,10 +6,23 @@ import platform
 import logging
 import json
 import re
+import queue
+import binascii
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 import numpy as np
 import cv2  # Import OpenCV globally
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from dotenv import load_dotenv
 import requests
 import glob
@@ -21,17 +34,28 @@ import sys
 # Configure logging
 logger = logging.getLogger(__name__)
 
+class _CameraCacheEntry:
+    """A cached OpenCV capture or IP camera settings dict, with when it was last used"""
+    __slots__ = ('camera', 'last_used')
+    
+    def __init__(self, camera, last_used=None):
+        self.camera = camera
+        self.last_used = last_used  # time.time() of last use, or None to never expire
+
 class WebcamController:
     def __init__(self, timelapse_dir='./timelapses'):
         # Convert relative path to absolute path to avoid issues with changing working directory
         self.timelapse_dir = os.path.abspath(timelapse_dir)
         self.current_session_dir = None
+        self.current_session_id = None  # Basename of current_session_dir
         self.is_capturing = False
         self.capture_thread = None
+        self.capture_stop_event = threading.Event()  # Set to wake and end the capture loop
         self.interval = 5  # Default interval in seconds
         self.auto_mode = False  # Auto start/stop with patterns
         self.selected_camera = '/dev/video0'  # Default camera
         self.available_cameras = []
+        self._camera_index_cache = {}  # Camera identifier -> resolved index, valid until available_cameras changes
         self.lock = threading.Lock()
         
         # Default camera settings - using neutral values to enable auto mode by default
@@ -41,11 +65,19 @@ class WebcamController:
             'exposure': 0.5     # Neutral value (was 0.1)
         }
         
-        # Camera cache to avoid reopening cameras
+        # JPEG quality for captured frames; 85 is about half the size of OpenCV's default 95
+        self.jpeg_quality = 85
+        
+        # Brightness/contrast lookup table, rebuilt when those settings change
+        self._adjustment_lut = None
+        self._adjustment_lut_key = None
+        
+        # Camera cache to avoid reopening cameras (key -> _CameraCacheEntry)
         self.camera_cache = {}
         self.camera_cache_lock = threading.Lock()
-        self.camera_last_used = {}
+        self.camera_cache_condition = threading.Condition(self.camera_cache_lock)  # Notified when a camera is cached
         self.camera_cache_timeout = 30  # Seconds to keep a camera open
+        self.frame_buffers = {}  # Last decoded frame per camera, reused as the destination of the next retrieve()
         
         # IP camera settings
         self.ip_camera_settings = {
@@ -53,10 +85,22 @@ class WebcamController:
             'verify_ssl': False  # Whether to verify SSL certificates
         }
         
+        # ffmpeg encoder arguments for create_video, probed on first use
+        self._video_encoder_args = None
+        self._video_encoder_lock = threading.Lock()
+        
         # Video creation process tracking
         self.ffmpeg_processes = {}
         self.ffmpeg_processes_lock = threading.Lock()
         
+        # list_sessions() summaries keyed by session id, as (directory mtime_ns, summary)
+        self.session_listing_cache = {}
+        
+        # Queues of clients streaming video progress, keyed by session id
+        self.progress_subscribers = {}
+        self.progress_subscribers_lock = threading.Lock()
+        self.video_progress = {}  # Latest progress update per session, also guarded by progress_subscribers_lock
+        
         # Create timelapses directory if it doesn't exist
         os.makedirs(self.timelapse_dir, exist_ok=True)
         
@@ -64,10 +108,25 @@ class WebcamController:
         self.platform = platform.system()
         logger.info(f"Detected platform: {self.platform}")
         
+        # Encoded timelapse frames waiting to be written, so slow disks don't delay the next capture
+        self.frame_write_queue = queue.Queue(maxsize=8)
+        self.frame_writer_thread = threading.Thread(target=self._frame_writer_loop, daemon=True)
+        self.frame_writer_thread.start()
+        
         # Start camera cache cleanup thread
         self.cache_cleanup_thread = threading.Thread(target=self._cleanup_camera_cache, daemon=True)
         self.cache_cleanup_thread.start()
         
+        # Cached result of device detection for scan_cameras()
+        self.camera_scan_lock = threading.Lock()
+        self.camera_scan_ttl = 60  # Seconds to trust a scan when device changes can't be watched
+        self._camera_scan_devices = None
+        self._camera_scan_expires = 0
+        self._camera_watch_active = False
+        if self.platform == 'Linux' and inotify_simple is not None:
+            self._camera_watch_active = True
+            threading.Thread(target=self._watch_video_devices, daemon=True).start()
+        
         # Load IP camera settings from environment variables
         self._load_ip_camera_settings()
         
@@ -102,19 +161,54 @@ class WebcamController:
         except Exception as e:
             logger.error(f"Error loading IP camera settings: {str(e)}")
     
-    def scan_cameras(self):
-        """Scan for available camera devices based on platform"""
+    def scan_cameras(self, force=False):
+        """Scan for available camera devices based on platform
+        
+        Device detection is cached: on Linux until inotify reports a /dev/video* change
+        (when inotify_simple is installed), otherwise for camera_scan_ttl seconds.
+        
+        Args:
+            force: If True, ignore the cache and detect devices again
+        """
         # Preserve existing IP cameras
         ip_cameras = [cam for cam in self.available_cameras if cam.startswith('ip_camera_')]
         
-        # Clear the list but keep IP cameras
-        self.available_cameras = ip_cameras.copy()
+        with self.camera_scan_lock:
+            now = time.monotonic()
+            if force or self._camera_scan_devices is None or now >= self._camera_scan_expires:
+                self._camera_scan_devices = self._detect_cameras()
+                self._camera_scan_expires = float('inf') if self._camera_watch_active else now + self.camera_scan_ttl
+            devices = self._camera_scan_devices
+        
+        # Rebuild the list, keeping IP cameras ahead of detected devices
+        self.available_cameras = ip_cameras + devices
+        
+        # If no physical cameras found, add a default one (but only if no IP cameras)
+        if len(self.available_cameras) == 0:
+            if self.platform == 'Linux':
+                self.available_cameras = ['/dev/video0']
+            elif self.platform == 'Windows':
+                self.available_cameras = ['0']  # Use index instead of name for Windows
+            elif self.platform == 'Darwin':
+                self.available_cameras = ['0']  # Use index for macOS too
+        
+        # Name and position lookups depend on the list, so resolve identifiers again
+        self._camera_index_cache.clear()
+        
+        logger.info(f"Available cameras: {self.available_cameras}")
+        return self.available_cameras
+    
+    def _detect_cameras(self):
+        """Probe the platform for physical camera devices (uncached)"""
+        cameras = []
         
         try:
             if self.platform == 'Linux':
                 # On Linux, look for video devices in /dev
-                video_devices = [f"/dev/video{i}" for i in range(10) if os.path.exists(f"/dev/video{i}")]
-                self.available_cameras.extend(video_devices)
+                # A single directory listing instead of a stat per index; sorted numerically so video10 follows video9
+                video_devices = [d for d in glob.glob('/dev/video*') if d[len('/dev/video'):].isdigit()]
+                video_devices.sort(key=lambda d: int(d[len('/dev/video'):]))
+                cameras.extend(video_devices)
             elif self.platform == 'Windows':
                 # On Windows, use more reliable method to detect cameras
                 try:
@@ -142,14 +236,14 @@ class WebcamController:
                             try:
                                 camera_name = line.split('"')[1]
                                 if camera_name and camera_name.strip():
-                                    self.available_cameras.append(camera_name)
+                                    cameras.append(camera_name)
                             except IndexError:
                                 pass
                 except Exception as e:
                     logger.warning(f"Error using ffmpeg to list devices: {str(e)}")
                     
                 # If no cameras found, try alternative method
-                if len(self.available_cameras) == len(ip_cameras):  # Only IP cameras found
+                if not cameras:
                     try:
                         # Try using PowerShell to get camera info
                         ps_command = "Get-CimInstance Win32_PnPEntity | Where-Object {$_.PNPClass -eq 'Camera'} | Select-Object Name | ConvertTo-Json"
@@ -166,12 +260,12 @@ class WebcamController:
                                 if isinstance(cameras_data, dict):
                                     camera_name = cameras_data.get('Name')
                                     if camera_name:
-                                        self.available_cameras.append(camera_name)
+                                        cameras.append(camera_name)
                                 elif isinstance(cameras_data, list):
                                     for camera in cameras_data:
                                         camera_name = camera.get('Name')
                                         if camera_name:
-                                            self.available_cameras.append(camera_name)
+                                            cameras.append(camera_name)
                             except json.JSONDecodeError:
                                 pass
                     except Exception as e:
@@ -198,12 +292,12 @@ class WebcamController:
                                 if match:
                                     index, name = match.groups()
                                     device = f"{index}:{name.strip()}"
-                                    self.available_cameras.append(device)
+                                    cameras.append(device)
                                 else:
                                     # Fallback to just the line content if pattern doesn't match
                                     parts = line.split(']')
                                     if len(parts) > 1:
-                                        self.available_cameras.append(parts[1].strip())
+                                        cameras.append(parts[1].strip())
                             except Exception as e:
                                 logger.debug(f"Error parsing camera line: {str(e)}")
 
@@ -211,7 +305,7 @@ class WebcamController:
                     logger.warning(f"Error using AVFoundation to list devices: {str(e)}")
 
                 # If no cameras found, try alternative method using system_profiler
-                if len(self.available_cameras) == len(ip_cameras):  # Only IP cameras found
+                if not cameras:
                     try:
                         result = subprocess.run(
                             ['system_profiler', 'SPCameraDataType', '-json'],
@@ -224,23 +318,32 @@ class WebcamController:
                             if 'SPCameraDataType' in data:
                                 for camera in data['SPCameraDataType']:
                                     if '_name' in camera:
-                                        self.available_cameras.append(f"0:{camera['_name']}")
+                                        cameras.append(f"0:{camera['_name']}")
                     except Exception as e:
                         logger.warning(f"Error using system_profiler to list cameras: {str(e)}")
         except Exception as e:
             logger.error(f"Error scanning for cameras: {str(e)}")
         
-        # If no physical cameras found, add a default one (but only if no IP cameras)
-        if len(self.available_cameras) == 0:
-            if self.platform == 'Linux':
-                self.available_cameras = ['/dev/video0']
-            elif self.platform == 'Windows':
-                self.available_cameras = ['0']  # Use index instead of name for Windows
-            elif self.platform == 'Darwin':
-                self.available_cameras = ['0']  # Use index for macOS too
+        return cameras
+    
+    def _watch_video_devices(self):
+        """Background thread that invalidates the camera scan cache when /dev/video* devices come or go"""
+        try:
+            inotify = inotify_simple.INotify()
+            inotify.add_watch('/dev', inotify_simple.flags.CREATE | inotify_simple.flags.DELETE)
+        except Exception as e:
+            logger.warning(f"Could not watch /dev for camera changes, falling back to a scan TTL: {str(e)}")
+            with self.camera_scan_lock:
+                self._camera_watch_active = False
+                self._camera_scan_expires = 0
+            return
         
-        logger.info(f"Available cameras: {self.available_cameras}")
-        return self.available_cameras
+        while True:
+            events = inotify.read()
+            if any(event.name.startswith('video') for event in events):
+                logger.debug("Video device change detected, invalidating camera scan cache")
+                with self.camera_scan_lock:
+                    self._camera_scan_expires = 0
     
     def start_timelapse(self, camera=None, interval=None, auto_mode=None, activity_file=None):
         """Start timelapse capture"""
@@ -259,7 +362,8 @@ class WebcamController:
             
             # Create a new session directory with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            self.current_session_dir = os.path.join(self.timelapse_dir, f"timelapse_{timestamp}")
+            self.current_session_id = f"timelapse_{timestamp}"
+            self.current_session_dir = os.path.join(self.timelapse_dir, self.current_session_id)
             os.makedirs(self.current_session_dir, exist_ok=True)
             
             # Save session info
@@ -280,6 +384,7 @@ class WebcamController:
             
             # Start capture thread
             self.is_capturing = True
+            self.capture_stop_event.clear()
             self.capture_thread = threading.Thread(target=self._capture_loop)
             self.capture_thread.daemon = True
             self.capture_thread.start()
@@ -294,9 +399,21 @@ class WebcamController:
                 logger.warning("No timelapse running")
                 return False
             
+            # Wake the capture loop so it exits instead of waiting out the interval, and wait for
+            # any capture in progress so the final frame doesn't share the camera with it
+            self.capture_stop_event.set()
+            if self.capture_thread:
+                self.capture_thread.join(timeout=2.0)
+            capture_finished = not (self.capture_thread and self.capture_thread.is_alive())
+            if not capture_finished:
+                logger.warning("Capture still in progress after 2s, skipping the final frame")
+            
             # Capture one final frame with buffer flushing to ensure we get the most recent frame
-            if self.current_session_dir:
+            if self.current_session_dir and capture_finished:
                 try:
+                    # Let queued frames land first so the final frame gets the next number
+                    self.frame_write_queue.join()
+                    
                     # Get the next frame number
                     frame_count = len(glob.glob(os.path.join(self.current_session_dir, "frame_*.jpg"))) + 1
                     
@@ -311,8 +428,11 @@ class WebcamController:
                     logger.error(f"Error capturing final frame: {str(e)}")
             
             self.is_capturing = False
-            if self.capture_thread:
-                self.capture_thread.join(timeout=2.0)
+            
+            # Hand the device back now rather than after the cache timeout; a capture that's still
+            # running is using it, so leave that camera to the cleanup thread
+            if capture_finished:
+                self._release_cameras(include_ip=False)
             
             logger.info("Stopped timelapse capture")
             return True
@@ -320,40 +440,38 @@ class WebcamController:
     def _capture_loop(self):
         """Background thread for capturing images at intervals"""
         frame_count = 0
-        last_capture_time = 0
+        next_capture_time = time.monotonic()
         
-        while self.is_capturing:
+        while not self.capture_stop_event.is_set():
             try:
-                # Get current time
-                current_time = time.time()
-                
-                # Check if it's time for the next capture
-                # This prevents double captures if the previous capture took longer than expected
-                if current_time - last_capture_time < self.interval:
-                    # Not time yet, sleep a bit and continue
-                    time.sleep(0.1)
-                    continue
-                
-                # Update last capture time
-                last_capture_time = current_time
-                
                 # Increment frame count
                 frame_count += 1
                 
-                # Generate timestamp and output filename
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                # Generate timestamp and output filename (time.strftime skips building a datetime)
+                timestamp = time.strftime("%Y%m%d_%H%M%S")
                 output_file = os.path.join(self.current_session_dir, f"frame_{frame_count:06d}_{timestamp}.jpg")
                 
                 # For timelapse captures, we want to balance between speed and getting recent frames
                 # Use fast_mode=True for better performance, but still flush the buffer
-                self.capture_single_frame(output_file=output_file, fast_mode=True)
+                self.capture_single_frame(output_file=output_file, fast_mode=True, async_write=True)
                 
                 logger.debug(f"Captured frame {frame_count} to {output_file}")
                 
+                # Schedule from the previous tick so capture time doesn't accumulate as drift
+                next_capture_time += self.interval
             except Exception as e:
                 logger.error(f"Error in capture loop: {str(e)}")
-                # Sleep a bit to avoid tight loop in case of persistent errors
-                time.sleep(max(1, self.interval / 2))  # Sleep at least 1 second, or half the interval
+                # Back off to avoid a tight loop in case of persistent errors
+                next_capture_time = time.monotonic() + max(1, self.interval / 2)  # At least 1 second, or half the interval
+            
+            # If a capture overran its slot, skip the missed ticks rather than capturing in a burst
+            now = time.monotonic()
+            if next_capture_time < now:
+                next_capture_time = now
+            
+            # Sleep until the next capture; stop_timelapse() sets the event to wake us immediately
+            if self.capture_stop_event.wait(next_capture_time - now):
+                break
     
     def _get_camera_index(self, camera=None):
         """Helper method to convert camera identifier to an index or return IP camera identifier
@@ -365,6 +483,21 @@ class WebcamController:
             Integer camera index for OpenCV or string identifier for IP cameras
         """
         camera_to_use = camera if camera is not None else self.selected_camera
+        
+        # Timelapse captures resolve the same identifier every frame, so remember the answer
+        if not isinstance(camera_to_use, (str, int)):
+            return self._resolve_camera_index(camera_to_use)
+        try:
+            return self._camera_index_cache[camera_to_use]
+        except KeyError:
+            pass
+        
+        camera_index = self._resolve_camera_index(camera_to_use)
+        self._camera_index_cache[camera_to_use] = camera_index
+        return camera_index
+
+    def _resolve_camera_index(self, camera_to_use):
+        """Resolve a camera identifier to an OpenCV index or IP camera identifier, see _get_camera_index"""
         camera_index = 0  # Default to first camera
         
         if camera_to_use is None:
@@ -419,19 +552,29 @@ class WebcamController:
         """Background thread to clean up unused camera objects"""
         while True:
             try:
-                current_time = time.time()
-                cameras_to_release = []
-                
-                with self.camera_cache_lock:
-                    for camera_id, last_used in list(self.camera_last_used.items()):
+                with self.camera_cache_condition:
+                    # Sleep until the least recently used camera is due to expire, or until one is cached
+                    while True:
+                        last_used_times = [entry.last_used for entry in self.camera_cache.values() if entry.last_used is not None]
+                        if not last_used_times:
+                            self.camera_cache_condition.wait()
+                            continue
+                        wait_time = min(last_used_times) + self.camera_cache_timeout - time.time()
+                        if wait_time <= 0:
+                            break
+                        self.camera_cache_condition.wait(wait_time)
+                    
+                    current_time = time.time()
+                    cameras_to_release = []
+                    for camera_id, entry in self.camera_cache.items():
                         # If camera hasn't been used in the timeout period, release it
-                        if current_time - last_used > self.camera_cache_timeout:
+                        if entry.last_used is not None and current_time - entry.last_used >= self.camera_cache_timeout:
                             cameras_to_release.append(camera_id)
                     
                     # Release cameras outside the loop to avoid modifying dict during iteration
                     for camera_id in cameras_to_release:
                         if camera_id in self.camera_cache:
-                            camera = self.camera_cache[camera_id]
+                            camera = self.camera_cache[camera_id].camera
                             # Check if this is an IP camera (dictionary) or OpenCV camera
                             if isinstance(camera, dict) and camera.get('type') == 'ip':
                                 # For IP cameras, just clear the cached frame
@@ -448,12 +591,11 @@ class WebcamController:
                             
                             # Remove from cache
                             del self.camera_cache[camera_id]
-                            del self.camera_last_used[camera_id]
+                            self.frame_buffers.pop(camera_id, None)
             except Exception as e:
                 logger.error(f"Error in camera cache cleanup: {str(e)}")
-            
-            # Sleep for a while before checking again
-            time.sleep(5)
+                # Avoid a tight loop in case of persistent errors
+                time.sleep(5)
 
     def _get_camera(self, camera_index):
         """Get a camera object from cache or create a new one
@@ -468,20 +610,23 @@ class WebcamController:
         
         with self.camera_cache_lock:
             # Update last used time if camera is in cache
-            if cache_key in self.camera_cache:
-                self.camera_last_used[cache_key] = time.time()
+            entry = self.camera_cache.get(cache_key)
+            if entry is not None:
+                if entry.last_used is not None:
+                    entry.last_used = time.time()
+                cam = entry.camera
                 
                 # For IP cameras, just return the cached settings
-                if isinstance(self.camera_cache[cache_key], dict) and self.camera_cache[cache_key].get('type') == 'ip':
-                    return self.camera_cache[cache_key]
+                if isinstance(cam, dict) and cam.get('type') == 'ip':
+                    return cam
                 
                 # For regular cameras, check if still valid
-                if not self.camera_cache[cache_key].isOpened():
+                if not cam.isOpened():
                     logger.debug(f"Cached camera {cache_key} is no longer valid, recreating")
-                    self.camera_cache[cache_key].release()
+                    cam.release()
                     del self.camera_cache[cache_key]
                 else:
-                    return self.camera_cache[cache_key]
+                    return cam
             
             # Check if this is an IP camera
             if isinstance(camera_index, str) and camera_index.startswith('ip_camera_'):
@@ -489,7 +634,7 @@ class WebcamController:
                 ip_camera_url = os.getenv('IP_CAMERA_URL')
                 if ip_camera_url:
                     # Create new IP camera settings
-                    self.camera_cache[camera_index] = {
+                    ip_camera = {
                         'type': 'ip',
                         'url': ip_camera_url,
                         'timeout': self.ip_camera_settings.get('timeout', 5),
@@ -497,9 +642,10 @@ class WebcamController:
                         'last_frame': None,
                         'last_frame_time': 0
                     }
-                    self.camera_last_used[camera_index] = time.time()
+                    self.camera_cache[camera_index] = _CameraCacheEntry(ip_camera, time.time())
+                    self.camera_cache_condition.notify()
                     logger.info(f"Recreated IP camera settings for {camera_index}")
-                    return self.camera_cache[camera_index]
+                    return ip_camera
                 else:
                     raise Exception(f"IP camera {camera_index} not found in cache and no URL in environment variables")
             
@@ -525,6 +671,14 @@ class WebcamController:
             if not cam.isOpened():
                 raise Exception(f"Failed to open camera {camera_index}")
             
+            # Keep only the newest frame queued so a cached camera doesn't hand back stale ones
+            # (not every backend supports this; the grab() flush below covers the rest)
+            cam.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            
+            # Ask for the camera's compressed MJPEG stream before negotiating resolution; most USB
+            # webcams only reach 720p/1080p at usable frame rates in MJPEG rather than raw YUYV
+            cam.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            
             # Set camera properties for better image quality
             # Use resolution from settings if available
             resolution = self.camera_settings.get('resolution', '1280x720')
@@ -561,8 +715,8 @@ class WebcamController:
                 logger.debug("Using auto exposure and default camera settings")
             
             # Add to cache
-            self.camera_cache[cache_key] = cam
-            self.camera_last_used[cache_key] = time.time()
+            self.camera_cache[cache_key] = _CameraCacheEntry(cam, time.time())
+            self.camera_cache_condition.notify()
             
             return cam
 
@@ -597,11 +751,17 @@ class WebcamController:
                 camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
                 camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
                 
-                # Read a test frame to verify the resolution works
-                success, frame = camera.read()
-                if success and frame is not None and frame.size > 0:
-                    actual_width = int(camera.get(cv2.CAP_PROP_FRAME_WIDTH))
-                    actual_height = int(camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                # The driver reports the negotiated resolution right away, so only read a
+                # test frame when it doesn't (some backends report 0 until streaming starts)
+                actual_width = int(camera.get(cv2.CAP_PROP_FRAME_WIDTH))
+                actual_height = int(camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                if actual_width <= 0 or actual_height <= 0:
+                    success, frame = camera.read()
+                    if not success or frame is None or frame.size == 0:
+                        continue
+                    actual_height, actual_width = frame.shape[:2]
+                
+                if actual_width > 0 and actual_height > 0:
                     logger.info(f"Camera resolution set to {actual_width}x{actual_height}")
                     
                     # Update the camera settings with the actual resolution
@@ -670,7 +830,41 @@ class WebcamController:
             logger.error(f"Error capturing frame from IP camera: {str(e)}")
             raise
 
-    def capture_single_frame(self, output_file=None, camera=None, return_base64=False, fast_mode=False):
+    def _get_adjustment_lut(self):
+        """Return the 256-entry brightness/contrast lookup table for the current camera settings"""
+        brightness = self.camera_settings['brightness']
+        contrast = self.camera_settings['contrast']
+        key = (brightness, contrast)
+        if self._adjustment_lut_key != key:
+            values = np.arange(256, dtype=np.float32)
+            
+            # Convert brightness from 0-1 to a -100 to 100 offset (0.5 is neutral), saturating like cv2.add
+            values = np.clip(np.rint(values + (brightness - 0.5) * 2.0 * 100), 0, 255)
+            
+            # Apply contrast around mid-grey (contrast of 1.0 is neutral) and clip to 0-1
+            values = np.clip((values / 255.0 - 0.5) * contrast + 0.5, 0, 1)
+            
+            self._adjustment_lut = (values * 255).astype(np.uint8)
+            self._adjustment_lut_key = key
+        return self._adjustment_lut
+
+    def _frame_writer_loop(self):
+        """Background thread that writes frames queued by capture_single_frame(async_write=True)"""
+        while True:
+            item = self.frame_write_queue.get()
+            try:
+                if item is None:
+                    return
+                output_file, data = item
+                with open(output_file, 'wb') as f:
+                    f.write(data)
+                logger.debug(f"Wrote frame to {output_file}")
+            except Exception as e:
+                logger.error(f"Error writing frame: {str(e)}")
+            finally:
+                self.frame_write_queue.task_done()
+
+    def capture_single_frame(self, output_file=None, camera=None, return_base64=False, fast_mode=False, async_write=False):
         """Capture a single frame using OpenCV or IP camera - can be used for both test captures and timelapse captures
         
         Args:
@@ -678,6 +872,7 @@ class WebcamController:
             camera: Camera identifier (index, string, or device path)
             return_base64: If True, return the frame as a base64 encoded string instead of saving to disk
             fast_mode: If True, skip image processing for faster capture
+            async_write: If True, hand the encoded frame to the writer thread instead of writing it here
             
         Returns:
             True if saved to disk successfully, or base64 encoded string if return_base64=True
@@ -699,12 +894,8 @@ class WebcamController:
                 frame = self._capture_ip_camera_frame(cam)
             else:
                 # Regular camera capture
-                # Reduced wait time - only wait if not in fast mode
-                if not fast_mode:
-                    time.sleep(0.1)  # Reduced from 0.5 to 0.1 seconds
-                
                 # Flush the camera buffer to get the most recent frame
-                # This helps prevent delayed frames in timelapses
+                # grab() skips decoding, so only the frame we keep is converted
                 if not fast_mode:
                     # For non-fast mode, flush more frames for better quality
                     self._flush_camera_buffer(cam, 5)
@@ -712,61 +903,43 @@ class WebcamController:
                     # For fast mode, just flush a couple frames to maintain performance
                     self._flush_camera_buffer(cam, 2)
                 
-                # Capture frame
-                ret, frame = cam.read()
+                # Decode the last grabbed frame into the previous frame's buffer so it isn't reallocated each time
+                cache_key = str(camera_index)  # Same key as camera_cache, so the buffer is dropped with its camera
+                ret, frame = cam.retrieve(self.frame_buffers.get(cache_key))
                 
                 if not ret or frame is None:
                     raise Exception("Failed to capture frame from camera")
+                self.frame_buffers[cache_key] = frame
             
             # Apply post-processing adjustments in software only if not in fast mode
             if not fast_mode:
-                # Convert brightness from 0-1 to -1 to 1 range (0.5 is neutral)
-                brightness_adjust = (self.camera_settings['brightness'] - 0.5) * 2.0
-                
-                # Apply brightness adjustment
-                if brightness_adjust > 0:
-                    # Increase brightness
-                    frame = cv2.addWeighted(frame, 1, np.zeros(frame.shape, frame.dtype), 0, brightness_adjust * 100)
-                else:
-                    # Decrease brightness
-                    frame = cv2.addWeighted(frame, 1, np.zeros(frame.shape, frame.dtype), 0, brightness_adjust * 100)
-                
-                # Apply contrast adjustment
-                # Convert to float and normalize to 0-1
-                f = frame.astype(np.float32) / 255.0
-                # Apply contrast adjustment (contrast_factor of 1.0 is neutral)
-                contrast_factor = self.camera_settings['contrast']
-                f = (f - 0.5) * contrast_factor + 0.5
-                # Clip to 0-1 range
-                f = np.clip(f, 0, 1)
-                # Convert back to 8-bit
-                frame = (f * 255).astype(np.uint8)
+                # Brightness and contrast map each 8-bit value independently, so apply them as one lookup table
+                frame = cv2.LUT(frame, self._get_adjustment_lut())
+            
+            if not return_base64 and output_file is None:
+                raise ValueError("output_file must be provided when return_base64 is False")
+            
+            # Encode the frame as JPEG once; the same bytes go to disk or into the base64 preview
+            success, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not success or buffer.size == 0:
+                raise Exception("Failed to encode image")
             
             # If return_base64 is True, return the frame as a base64 encoded string
             if return_base64:
-                # Encode the frame as JPEG
-                success, buffer = cv2.imencode('.jpg', frame)
-                if not success:
-                    raise Exception("Failed to encode image")
-                
-                # Convert to base64
-                import base64
-                jpg_as_text = base64.b64encode(buffer).decode('utf-8')
+                # b2a_base64 is the C primitive behind b64encode, minus the extra copy
+                jpg_as_text = binascii.b2a_base64(buffer, newline=False).decode('ascii')
                 
                 # Return the base64 encoded image with MIME type
                 return f"data:image/jpeg;base64,{jpg_as_text}"
             
             # Otherwise save the processed frame to disk
+            elif async_write:
+                # Blocks only if the writer has fallen a full queue behind
+                self.frame_write_queue.put((output_file, buffer.tobytes()))
+                return True
             else:
-                if output_file is None:
-                    raise ValueError("output_file must be provided when return_base64 is False")
-                
-                # Save the processed frame
-                cv2.imwrite(output_file, frame)
-                
-                # Verify the file was created successfully
-                if not os.path.exists(output_file) or os.path.getsize(output_file) == 0:
-                    raise Exception(f"Failed to save frame - output file is empty or missing: {output_file}")
+                with open(output_file, 'wb') as f:
+                    f.write(buffer.tobytes())
                     
                 logger.debug(f"Captured and processed frame to {output_file}")
                 return True
@@ -812,6 +985,54 @@ class WebcamController:
             logger.error(f"Error taking test capture: {str(e)}")
             raise
     
+    # Hardware H.264 encoders to try before falling back to libx264, in order of preference
+    HW_VIDEO_ENCODERS = {
+        'h264_nvenc': ['-c:v', 'h264_nvenc', '-preset', 'p4', '-b:v', '8M'],
+        'h264_qsv': ['-c:v', 'h264_qsv', '-b:v', '8M'],
+        'h264_amf': ['-c:v', 'h264_amf', '-b:v', '8M'],
+    }
+    
+    def _get_video_encoder_args(self):
+        """Return the ffmpeg encoder arguments for create_video, picking a working hardware encoder if there is one
+        
+        VIDEO_ENCODER in the environment forces an encoder by name (e.g. libx264 to skip probing).
+        """
+        with self._video_encoder_lock:
+            if self._video_encoder_args is not None:
+                return self._video_encoder_args
+            
+            encoder_args = ['-c:v', 'libx264']
+            forced = os.getenv('VIDEO_ENCODER')
+            if forced:
+                encoder_args = self.HW_VIDEO_ENCODERS.get(forced, ['-c:v', forced])
+            else:
+                try:
+                    result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                            capture_output=True, text=True, timeout=10)
+                    for name, args in self.HW_VIDEO_ENCODERS.items():
+                        # Builds often list encoders the hardware can't run, so confirm with a tiny test encode
+                        if name in result.stdout and self._try_video_encoder(args):
+                            encoder_args = args
+                            break
+                except Exception as e:
+                    logger.warning(f"Could not probe ffmpeg encoders: {str(e)}")
+            
+            logger.info(f"Using video encoder: {encoder_args[1]}")
+            self._video_encoder_args = encoder_args
+            return encoder_args
+    
+    def _try_video_encoder(self, encoder_args):
+        """Check that ffmpeg can actually encode with encoder_args"""
+        try:
+            result = subprocess.run(
+                ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-f', 'lavfi', '-i', 'color=size=256x256:duration=0.2',
+                 *encoder_args, '-pix_fmt', 'yuv420p', '-f', 'null', '-'],
+                capture_output=True, timeout=20
+            )
+            return result.returncode == 0
+        except Exception:
+            return False
+
     def create_video(self, session_dir=None, fps=10):
         """Create a video from the captured frames"""
         if session_dir is None:
@@ -823,14 +1044,15 @@ class WebcamController:
         
         # Initialize variables that need to be cleaned up
         process = None
-        temp_list_file = None
-        stdout_thread = None
+        progress_thread = None
         stderr_thread = None
+        feed_thread = None
         session_id = Path(session_dir).name
         
         try:
             # Get all jpg files in the directory
-            frames = sorted([f for f in os.listdir(session_dir) if f.endswith('.jpg')])
+            with os.scandir(session_dir) as entries:
+                frames = sorted(entry.name for entry in entries if entry.name.endswith('.jpg'))
             
             if not frames:
                 logger.error(f"No frames found in {session_dir}")
@@ -839,13 +1061,6 @@ class WebcamController:
             # Create output video filename
             output_video = os.path.join(session_dir, f"timelapse_{Path(session_dir).name}.mp4")
             
-            # Create a temporary file list for ffmpeg with absolute paths
-            temp_list_file = os.path.join(session_dir, "frames_list.txt")
-            with open(temp_list_file, 'w') as f:
-                for frame in frames:
-                    # Write the full absolute path to each frame
-                    f.write(f"file '{os.path.abspath(os.path.join(session_dir, frame))}'\n")
-            
             # Store progress information in a status file
             status_file = os.path.join(session_dir, "video_progress.json")
             
@@ -855,16 +1070,23 @@ class WebcamController:
             # Store the initial start time
             start_time = time.time()
             
-            # Helper function to safely write progress data
+            # Helper function to publish progress and record the start and end of the run in the status file
             def write_progress_data(data):
                 with status_lock:
                     try:
+                        self.publish_progress(session_id, data)
+                        
+                        # Running updates are served from memory (see get_video_progress); the file
+                        # only needs the statuses that should outlive this process
+                        if data.get('status') == 'processing':
+                            return
+                        
                         # If we're updating an existing file, try to preserve the original start_time
                         original_start_time = None
                         if os.path.exists(status_file):
                             try:
-                                with open(status_file, 'r') as f:
-                                    existing_data = json.load(f)
+                                with open(status_file, 'rb') as f:
+                                    existing_data = orjson.loads(f.read()) if orjson is not None else json.load(f)
                                     if 'start_time' in existing_data:
                                         original_start_time = existing_data['start_time']
                             except:
@@ -874,10 +1096,16 @@ class WebcamController:
                         if original_start_time is not None and 'start_time' in data:
                             data['start_time'] = original_start_time
                         
-                        with open(status_file, 'w') as f:
-                            json.dump(data, f, ensure_ascii=True)
-                            f.flush()
-                            os.fsync(f.fileno())  # Ensure data is written to disk
+                        # Write to a temp file and swap it in so readers never see a half-written file
+                        temp_file = f"{status_file}.tmp"
+                        with open(temp_file, 'wb') as f:
+                            f.write(orjson.dumps(data) if orjson is not None else json.dumps(data).encode('ascii'))
+                            # The file only gets the 'starting' and final statuses; fsync just the final one,
+                            # since that's what the UI and a restarted server rely on
+                            if data.get('status') in ('completed', 'failed', 'cancelled'):
+                                f.flush()
+                                os.fsync(f.fileno())
+                        os.replace(temp_file, status_file)
                     except Exception as e:
                         logger.error(f"Error writing progress data: {str(e)}")
             
@@ -889,96 +1117,107 @@ class WebcamController:
                 'start_time': start_time
             })
             
-            # Use ffmpeg with absolute paths instead of changing directory
+            # Stream the JPEG frames to ffmpeg over stdin instead of having it open each one from a list file
             try:
                 # Use a longer timeout for larger sessions (10 minutes)
                 # Use Popen instead of run to capture output in real-time
                 process = subprocess.Popen([
                     'ffmpeg',
-                    '-f', 'concat',
-                    '-safe', '0',
-                    '-r', str(fps),
-                    '-i', temp_list_file,
-                    '-c:v', 'libx264',
+                    '-f', 'image2pipe',
+                    '-framerate', str(fps),
+                    '-c:v', 'mjpeg',
+                    '-i', '-',
+                    *self._get_video_encoder_args(),
                     '-pix_fmt', 'yuv420p',
                     '-progress', 'pipe:1',  # Output progress information to stdout
+                    '-nostats',  # The same counters in text form on stderr aren't needed
                     '-y',
                     output_video
-                ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+                ], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
                 
                 # Store the process in our tracking dictionary
+                # Keep our own reference: cancel_video() marks it cancelled and may drop it from the dict
+                process_info = {
+                    'process': process,
+                    'start_time': start_time,
+                    'status_file': status_file,
+                    'write_progress': write_progress_data
+                }
                 with self.ffmpeg_processes_lock:
-                    self.ffmpeg_processes[session_id] = {
-                        'process': process,
-                        'start_time': start_time,
-                        'status_file': status_file,
-                        'write_progress': write_progress_data
-                    }
+                    self.ffmpeg_processes[session_id] = process_info
                 
                 # Track progress
                 frame_count = 0
                 total_frames = len(frames)
                 
-                # Start a thread to read stderr for progress updates
-                def read_stderr():
+                # -progress writes a block of key=value lines to stdout per update, terminated by
+                # progress=continue (or progress=end for the last one); report once per block
+                def read_progress():
                     nonlocal frame_count
                     try:
-                        for line in process.stderr:
-                            if 'frame=' in line:
-                                try:
-                                    # Extract frame number
-                                    frame_match = re.search(r'frame=\s*(\d+)', line)
-                                    if frame_match:
-                                        frame_count = int(frame_match.group(1))
-                                        progress = min(95, (frame_count / total_frames) * 100)
-                                        
-                                        # Update progress file
-                                        write_progress_data({
-                                            'status': 'processing',
-                                            'progress': progress,
-                                            'frame': frame_count,
-                                            'total_frames': total_frames,
-                                            'start_time': start_time,
-                                            'elapsed_seconds': time.time() - start_time
-                                        })
-                                except Exception as e:
-                                    logger.error(f"Error parsing FFmpeg output: {str(e)}")
+                        block = {}
+                        # The output is plain ASCII, so work on the raw bytes instead of decoding every line
+                        for line in process.stdout:
+                            key, _, value = line.strip().partition(b'=')
+                            if key != b'progress':
+                                block[key] = value
+                                continue
+                            
+                            try:
+                                if b'frame' in block:
+                                    frame_count = int(block[b'frame'])
+                                    progress = min(95, (frame_count / total_frames) * 100)
+                                    
+                                    # Update progress file
+                                    write_progress_data({
+                                        'status': 'processing',
+                                        'progress': progress,
+                                        'frame': frame_count,
+                                        'total_frames': total_frames,
+                                        'start_time': start_time,
+                                        'elapsed_seconds': time.time() - start_time
+                                    })
+                            except ValueError as e:
+                                logger.error(f"Error parsing FFmpeg progress: {str(e)}")
+                            block = {}
                     except Exception as e:
-                        logger.error(f"Error in stderr reading thread: {str(e)}")
+                        logger.error(f"Error in progress reading thread: {str(e)}")
                 
-                # Start a thread to read stdout for progress updates
-                def read_stdout():
-                    nonlocal frame_count
+                # Write frames into ffmpeg's stdin; closing it marks the end of the input
+                def feed_frames():
                     try:
-                        for line in process.stdout:
-                            if 'frame=' in line:
-                                try:
-                                    # Extract frame number
-                                    frame_match = re.search(r'frame=\s*(\d+)', line)
-                                    if frame_match:
-                                        frame_count = int(frame_match.group(1))
-                                        progress = min(95, (frame_count / total_frames) * 100)
-                                        
-                                        # Update progress file
-                                        write_progress_data({
-                                            'status': 'processing',
-                                            'progress': progress,
-                                            'frame': frame_count,
-                                            'total_frames': total_frames,
-                                            'start_time': start_time,
-                                            'elapsed_seconds': time.time() - start_time
-                                        })
-                                except Exception as e:
-                                    logger.error(f"Error parsing FFmpeg output: {str(e)}")
-                    except Exception as e:
-                        logger.error(f"Error in stdout reading thread: {str(e)}")
+                        for frame in frames:
+                            try:
+                                with open(os.path.join(session_dir, frame), 'rb') as src:
+                                    shutil.copyfileobj(src, process.stdin, 1 << 20)
+                            except FileNotFoundError:
+                                logger.warning(f"Frame disappeared before encoding, skipping: {frame}")
+                    except (BrokenPipeError, ValueError, OSError) as e:
+                        # ffmpeg exited (e.g. cancelled) before taking every frame
+                        logger.debug(f"Stopped feeding frames to ffmpeg: {str(e)}")
+                    finally:
+                        try:
+                            process.stdin.close()
+                        except OSError:
+                            pass
+                
+                # Drain stderr so ffmpeg never blocks on it, keeping the last lines to explain a failure
+                stderr_tail = deque(maxlen=20)
+                def drain_stderr():
+                    try:
+                        for line in process.stderr:
+                            line = line.decode('utf-8', errors='replace').strip()
+                            if line:
+                                stderr_tail.append(line)
+                    except (ValueError, OSError):
+                        pass
                 
                 # Start the threads
-                stdout_thread = threading.Thread(target=read_stdout)
-                stderr_thread = threading.Thread(target=read_stderr)
-                stdout_thread.daemon = True
-                stderr_thread.daemon = True
-                stdout_thread.start()
+                feed_thread = threading.Thread(target=feed_frames, daemon=True)
+                feed_thread.start()
+                progress_thread = threading.Thread(target=read_progress, daemon=True)
+                progress_thread.start()
+                stderr_thread = threading.Thread(target=drain_stderr, daemon=True)
                 stderr_thread.start()
                 
                 # Wait for the process to complete with timeout
@@ -987,7 +1226,7 @@ class WebcamController:
                     
                     # Check if process was terminated by cancel
                     with self.ffmpeg_processes_lock:
-                        if session_id in self.ffmpeg_processes and self.ffmpeg_processes[session_id].get('cancelled', False):
+                        if process_info.get('cancelled', False):
                             write_progress_data({
                                 'status': 'cancelled',
                                 'progress': 0,
@@ -1029,6 +1268,20 @@ class WebcamController:
                     if session_id in self.ffmpeg_processes:
                         del self.ffmpeg_processes[session_id]
                 
+                if process.returncode != 0:
+                    # Let the drain thread collect ffmpeg's last words before reporting them
+                    stderr_thread.join(timeout=1)
+                    error_output = '\n'.join(stderr_tail)
+                    logger.error(f"FFmpeg exited with code {process.returncode}: {error_output}")
+                    write_progress_data({
+                        'status': 'failed',
+                        'error': f"FFmpeg exited with code {process.returncode}: {error_output}",
+                        'start_time': start_time,
+                        'end_time': time.time(),
+                        'elapsed_seconds': time.time() - start_time
+                    })
+                    return False
+                
                 # Update status to completed
                 write_progress_data({
                     'status': 'completed',
@@ -1057,13 +1310,6 @@ class WebcamController:
                         
                 return False
             
-            # Clean up the temporary file
-            try:
-                if temp_list_file and os.path.exists(temp_list_file):
-                    os.remove(temp_list_file)
-            except Exception as e:
-                logger.error(f"Error removing temporary file: {str(e)}")
-            
             logger.info(f"Created timelapse video: {output_video}")
             return {
                 'success': True,
@@ -1078,6 +1324,11 @@ class WebcamController:
             try:
                 # Close process pipes if they're still open
                 if process:
+                    if process.stdin and not process.stdin.closed:
+                        try:
+                            process.stdin.close()
+                        except OSError:
+                            pass
                     if process.stdout:
                         process.stdout.close()
                     if process.stderr:
@@ -1096,21 +1347,74 @@ class WebcamController:
                     if session_id in self.ffmpeg_processes:
                         del self.ffmpeg_processes[session_id]
                 
-                # Clean up temporary file if it exists
-                if temp_list_file and os.path.exists(temp_list_file):
-                    os.remove(temp_list_file)
-                    
                 # Wait for threads to finish if they're still running
                 # We set a short timeout since they're daemon threads
-                if stdout_thread and stdout_thread.is_alive():
-                    stdout_thread.join(timeout=1)
+                if progress_thread and progress_thread.is_alive():
+                    progress_thread.join(timeout=1)
                 if stderr_thread and stderr_thread.is_alive():
                     stderr_thread.join(timeout=1)
+                if feed_thread and feed_thread.is_alive():
+                    feed_thread.join(timeout=1)
                     
                 logger.debug("Video creation resources cleaned up")
             except Exception as cleanup_error:
                 logger.error(f"Error during cleanup in create_video: {str(cleanup_error)}")
 
+    def subscribe_progress(self, session_id):
+        """Register for video progress updates of a session, returning the queue they are pushed to
+        
+        The queue starts with the session's latest update, so a late or reconnecting client still
+        sees where the job is (including a final status it would otherwise have missed).
+        """
+        progress_queue = queue.Queue(maxsize=100)
+        with self.progress_subscribers_lock:
+            latest = self.video_progress.get(session_id)
+            if latest is not None:
+                progress_queue.put_nowait(self._progress_payload(latest))
+            self.progress_subscribers.setdefault(session_id, []).append(progress_queue)
+        return progress_queue
+    
+    @staticmethod
+    def _progress_payload(data):
+        """Serialize a progress update for the subscriber queues"""
+        return orjson.dumps(data).decode('utf-8') if orjson is not None else json.dumps(data)
+    
+    def unsubscribe_progress(self, session_id, progress_queue):
+        """Stop pushing video progress updates to a queue returned by subscribe_progress"""
+        with self.progress_subscribers_lock:
+            subscribers = self.progress_subscribers.get(session_id)
+            if subscribers and progress_queue in subscribers:
+                subscribers.remove(progress_queue)
+                if not subscribers:
+                    del self.progress_subscribers[session_id]
+    
+    def get_video_progress(self, session_id):
+        """Return a copy of the latest video progress update published for a session, or None"""
+        with self.progress_subscribers_lock:
+            data = self.video_progress.get(session_id)
+        return dict(data) if data is not None else None
+    
+    def clear_video_progress(self, session_id):
+        """Forget a session's last video progress update, e.g. before starting a new run"""
+        with self.progress_subscribers_lock:
+            self.video_progress.pop(session_id, None)
+    
+    def publish_progress(self, session_id, data):
+        """Record a progress update and push it to every subscriber of a session"""
+        with self.progress_subscribers_lock:
+            self.video_progress[session_id] = data
+            subscribers = list(self.progress_subscribers.get(session_id, ()))
+        if not subscribers:
+            return
+        
+        payload = self._progress_payload(data)
+        for progress_queue in subscribers:
+            try:
+                progress_queue.put_nowait(payload)
+            except queue.Full:
+                # A stalled client shouldn't hold up encoding; it'll catch up on the next update
+                pass
+    
     def cancel_video(self, session_id):
         """Cancel an ongoing video creation process"""
         with self.ffmpeg_processes_lock:
@@ -1182,58 +1486,30 @@ class WebcamController:
         sessions = []
         
         try:
-            for item in os.listdir(self.timelapse_dir):
-                session_path = os.path.join(self.timelapse_dir, item)
-                if os.path.isdir(session_path) and item.startswith('timelapse_'):
-                    # Get session info
-                    info_file = os.path.join(session_path, 'session_info.json')
-                    info = {}
-                    if os.path.exists(info_file):
-                        with open(info_file, 'r') as f:
-                            info = json.load(f)
-                    
-                    # Count frames
-                    frames = [f for f in os.listdir(session_path) if f.endswith('.jpg')]
-                    frame_count = len(frames)
-                    
-                    # Check if video exists
-                    video_file = os.path.join(session_path, f"timelapse_{item}.mp4")
-                    has_video = os.path.exists(video_file)
-                    
-                    # Get thumbnail (most recent frame)
-                    thumbnail = None
-                    if frames:
-                        # Sort frames by timestamp in filename
-                        # Frame filenames have format: frame_000001_YYYYMMDD_HHMMSS.jpg or frame_000001_YYYYMMDD_HHMMSS_final.jpg
-                        # We want to sort by the timestamp part
-                        def get_frame_timestamp(filename):
-                            # Extract the timestamp part from the filename
-                            # Filename format: frame_000001_YYYYMMDD_HHMMSS.jpg or frame_000001_YYYYMMDD_HHMMSS_final.jpg
-                            
-                            # Use regex to extract the timestamp parts
-                            match = re.search(r'_(\d{8})_(\d{6})', filename)
-                            if match:
-                                # Combine the date and time parts
-                                date_part = match.group(1)
-                                time_part = match.group(2)
-                                return f"{date_part}_{time_part}"
-                            
-                            # Fallback to simple sorting if regex doesn't match
-                            return filename
+            listing_cache = {}
+            now = time.time()
+            # scandir's entries carry the file type from the directory read, so is_dir() needs no stat
+            with os.scandir(self.timelapse_dir) as entries:
+                for entry in entries:
+                    item = entry.name
+                    if item.startswith('timelapse_') and entry.is_dir():
+                        # Adding or removing a frame, video or info file bumps the directory's mtime,
+                        # so an unchanged mtime means the cached summary is still accurate
+                        mtime_ns = entry.stat().st_mtime_ns
+                        cached = self.session_listing_cache.get(item)
+                        if cached is not None and cached[0] == mtime_ns:
+                            session = cached[1]
+                        else:
+                            session = self._summarize_session(item, entry.path)
                         
-                        # Sort frames by timestamp (newest last)
-                        sorted_frames = sorted(frames, key=get_frame_timestamp)
-                        # Use the last frame (most recent) as the thumbnail
-                        thumbnail = os.path.join(item, sorted_frames[-1])
-                    
-                    sessions.append({
-                        'id': item,
-                        'path': session_path,
-                        'info': info,
-                        'frame_count': frame_count,
-                        'has_video': has_video,
-                        'thumbnail': thumbnail
-                    })
+                        # A change within the filesystem's timestamp granularity wouldn't move the mtime,
+                        # so only keep summaries of directories that have settled
+                        if now - mtime_ns / 1e9 > 2:
+                            listing_cache[item] = (mtime_ns, session)
+                        sessions.append(session)
+            
+            # Sessions that weren't seen (e.g. deleted) drop out of the cache here
+            self.session_listing_cache = listing_cache
         except Exception as e:
             logger.error(f"Error listing sessions: {str(e)}")
         
@@ -1241,6 +1517,58 @@ class WebcamController:
         sessions.sort(key=lambda x: x['id'], reverse=True)
         return sessions
     
+    def _summarize_session(self, item, session_path):
+        """Build the list_sessions() entry for one session directory"""
+        # Get session info
+        info_file = os.path.join(session_path, 'session_info.json')
+        info = {}
+        if os.path.exists(info_file):
+            with open(info_file, 'rb') as f:
+                info = orjson.loads(f.read()) if orjson is not None else json.load(f)
+        
+        # Count frames
+        frames = [f for f in os.listdir(session_path) if f.endswith('.jpg')]
+        frame_count = len(frames)
+        
+        # Check if video exists
+        video_file = os.path.join(session_path, f"timelapse_{item}.mp4")
+        has_video = os.path.exists(video_file)
+        
+        # Get thumbnail (most recent frame)
+        thumbnail = None
+        if frames:
+            # Sort frames by timestamp in filename
+            # Frame filenames have format: frame_000001_YYYYMMDD_HHMMSS.jpg or frame_000001_YYYYMMDD_HHMMSS_final.jpg
+            # We want to sort by the timestamp part
+            def get_frame_timestamp(filename):
+                # Extract the timestamp part from the filename
+                # Filename format: frame_000001_YYYYMMDD_HHMMSS.jpg or frame_000001_YYYYMMDD_HHMMSS_final.jpg
+                
+                # Use regex to extract the timestamp parts
+                match = re.search(r'_(\d{8})_(\d{6})', filename)
+                if match:
+                    # Combine the date and time parts
+                    date_part = match.group(1)
+                    time_part = match.group(2)
+                    return f"{date_part}_{time_part}"
+                
+                # Fallback to simple sorting if regex doesn't match
+                return filename
+            
+            # Sort frames by timestamp (newest last)
+            sorted_frames = sorted(frames, key=get_frame_timestamp)
+            # Use the last frame (most recent) as the thumbnail
+            thumbnail = os.path.join(item, sorted_frames[-1])
+        
+        return {
+            'id': item,
+            'path': session_path,
+            'info': info,
+            'frame_count': frame_count,
+            'has_video': has_video,
+            'thumbnail': thumbnail
+        }
+    
     def get_session_frames(self, session_id):
         """Get all frames for a session"""
         session_path = os.path.join(self.timelapse_dir, session_id)
@@ -1249,12 +1577,14 @@ class WebcamController:
         
         frames = []
         try:
-            for item in os.listdir(session_path):
-                if item.endswith('.jpg') and item.startswith('frame_'):
-                    frames.append({
-                        'path': os.path.join(session_id, item),
-                        'filename': item
-                    })
+            with os.scandir(session_path) as entries:
+                for entry in entries:
+                    item = entry.name
+                    if item.endswith('.jpg') and item.startswith('frame_'):
+                        frames.append({
+                            'path': os.path.join(session_id, item),
+                            'filename': item
+                        })
         except Exception as e:
             logger.error(f"Error getting session frames: {str(e)}")
         
@@ -1281,7 +1611,7 @@ class WebcamController:
         with self.lock:
             status = {
                 'is_capturing': self.is_capturing,
-                'current_session': os.path.basename(self.current_session_dir) if self.current_session_dir else None,
+                'current_session': self.current_session_id,
                 'interval': self.interval,
                 'auto_mode': self.auto_mode,
                 'selected_camera': self.selected_camera,
@@ -1292,7 +1622,7 @@ class WebcamController:
             if self.is_capturing and self.current_session_dir:
                 try:
                     # Get the session ID
-                    session_id = os.path.basename(self.current_session_dir)
+                    session_id = self.current_session_id
                     
                     # Get frames for this session
                     frames = self.get_session_frames(session_id)
@@ -1335,13 +1665,15 @@ class WebcamController:
                 return False
             
             # Delete all files in the directory
-            for file in os.listdir(session_dir):
-                file_path = os.path.join(session_dir, file)
+            # Read the whole listing before unlinking; removing entries mid-scan can make readdir skip some
+            with os.scandir(session_dir) as it:
+                entries = list(it)
+            for entry in entries:
                 try:
-                    if os.path.isfile(file_path):
-                        os.unlink(file_path)
+                    if entry.is_file():
+                        os.unlink(entry.path)
                 except Exception as e:
-                    logger.error(f"Error deleting file {file_path}: {str(e)}")
+                    logger.error(f"Error deleting file {entry.path}: {str(e)}")
             
             # Delete the directory
             os.rmdir(session_dir)
@@ -1396,6 +1728,10 @@ class WebcamController:
         # Stop any active timelapse
         if self.is_capturing:
             self.stop_timelapse()
+        
+        # Write out any queued frames, then stop the writer thread
+        self.frame_write_queue.put(None)
+        self.frame_writer_thread.join(timeout=5)
             
         # Terminate any active ffmpeg processes
         with self.ffmpeg_processes_lock:
@@ -1424,12 +1760,27 @@ class WebcamController:
             self.ffmpeg_processes.clear()
             
         # Release all cached cameras
+        self._release_cameras()
+        
+        logger.info("WebcamController cleanup complete")
+
+    def _release_cameras(self, include_ip=True):
+        """Release cached cameras and drop them from the cache
+        
+        Args:
+            include_ip: If False, only OpenCV devices are released and IP cameras stay cached
+        """
         with self.camera_cache_lock:
-            for camera_id, cam in list(self.camera_cache.items()):
+            for camera_id, entry in list(self.camera_cache.items()):
+                cam = entry.camera
+                is_ip_camera = isinstance(cam, dict) and cam.get('type') == 'ip'
+                if is_ip_camera and not include_ip:
+                    continue
+                
                 logger.debug(f"Releasing camera {camera_id}")
                 try:
                     # Handle IP cameras differently
-                    if isinstance(cam, dict) and cam.get('type') == 'ip':
+                    if is_ip_camera:
                         # Clear cached frame
                         cam['last_frame'] = None
                         cam['last_frame_time'] = 0
@@ -1438,12 +1789,10 @@ class WebcamController:
                         cam.release()
                 except Exception as e:
                     logger.error(f"Error releasing camera {camera_id}: {str(e)}")
-            
-            # Clear the cache
-            self.camera_cache.clear()
-            self.camera_last_used.clear()
-        
-        logger.info("WebcamController cleanup complete")
+                
+                # Remove from cache
+                del self.camera_cache[camera_id]
+                self.frame_buffers.pop(camera_id, None)
 
     def set_resolution(self, width, height):
         """Set camera resolution
@@ -1462,7 +1811,8 @@ class WebcamController:
             
             # Apply to any cached cameras
             with self.camera_cache_lock:
-                for camera_key, camera in self.camera_cache.items():
+                for camera_key, entry in self.camera_cache.items():
+                    camera = entry.camera
                     if camera.isOpened():
                         actual_width, actual_height = self._set_camera_resolution(camera, resolution_str)
                         
@@ -1799,17 +2149,19 @@ If you encounter issues with the conversion scripts:
             camera_id = f"ip_camera_{len([c for c in self.available_cameras if c.startswith('ip_camera_')])}"
             
             # Store camera settings
-            self.camera_cache[camera_id] = {
+            # Added IP cameras have no last-used time, so the cleanup thread never drops them
+            self.camera_cache[camera_id] = _CameraCacheEntry({
                 'type': 'ip',
                 'url': url,
                 'timeout': timeout,
                 'verify_ssl': verify_ssl,
                 'last_frame': None,
                 'last_frame_time': 0
-            }
+            })
             
             # Add to available cameras list
             self.available_cameras.append(camera_id)
+            self._camera_index_cache.clear()
             
             logger.info(f"Added IP camera: {url}")
             return True